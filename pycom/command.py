@@ -5,8 +5,9 @@ according to the current terminal operation mode
 import curses
 import curses.ascii
 import logging
-from typing import Callable, Dict, NewType
+from typing import Callable, Dict, List, NewType, Optional, Tuple, TypeVar
 
+from pycom.cursorpos import CursorPos
 import pycom.terminal
 import pycom.utils
 from pycom.mode import Mode
@@ -18,26 +19,77 @@ __version__ = '1.0'
 
 
 TypeKey = NewType('TypeKey', int)
+KeyValue = TypeVar('KeyValue')
+
+# Number of key codes handled by the dispatch tables: the ASCII characters and
+# the curses special keys
+KEY_NB = curses.KEY_MAX + 1
+
+# Key codes to be added as-is to the current line (neither control nor meta)
+_IS_PRINTABLE = bytearray(
+    not curses.ascii.iscntrl(key) and not curses.ascii.ismeta(key)
+    for key in range(KEY_NB))
+
+# Characters of the printable key codes, to avoid a "chr" call on each key
+_CHR = tuple(map(chr, range(256)))
+
+
+def _key_table(mapping: Dict[int, KeyValue]) -> List[Optional[KeyValue]]:
+    '''Convert the key code indexed "mapping" into a list indexed by key code,
+    None indicating the key code is not mapped
+    '''
+    table: List[Optional[KeyValue]] = [None] * KEY_NB
+    for key, value in mapping.items():
+        table[key] = value
+    return table
+
+
+def _key_name(key: int) -> str:
+    '''Returns the name of the key code "key", for the user messages'''
+    description = pycom.utils.key_describe(key)
+    if description is None:
+        return str(key)
+    return f'{description} ({key})'
 
 
 class Command:
     '''Normal mode and base command class'''
+    __slots__ = ['_dispatch', 'interface', 'logger', 'mode_idx', 'terminal']
 
-    KEYMAP_CURSOR = {
-        curses.KEY_LEFT: pycom.cursorpos.CursorPos.LEFT,
-        curses.KEY_RIGHT: pycom.cursorpos.CursorPos.RIGHT,
-        curses.KEY_HOME: pycom.cursorpos.CursorPos.HOME,
-        curses.KEY_END: pycom.cursorpos.CursorPos.END
-    }
+    KEYMAP_CURSOR = _key_table({
+        curses.KEY_LEFT: CursorPos.LEFT,
+        curses.KEY_RIGHT: CursorPos.RIGHT,
+        curses.KEY_HOME: CursorPos.HOME,
+        curses.KEY_END: CursorPos.END
+    })
 
-    MAP_MODE: Dict[int, Mode] = {
+    MAP_MODE: List[Optional[Mode]] = _key_table({
         curses.ascii.BEL: Mode.NORMAL,
         curses.ascii.HT: Mode.COMPLETION,
         curses.ascii.TAB: Mode.COMPLETION,
         curses.ascii.DC2: Mode.SEARCH,
         curses.ascii.ESC: Mode.ESCAPE,
         curses.KEY_UP: Mode.HISTORY,
-    }
+    })
+
+    # Key codes and the name of the method handling them, bound per instance
+    _MAP_TEMPLATE: Tuple[Tuple[int, str], ...] = (
+        (curses.ascii.BEL, 'mode_set'),
+        (curses.ascii.EOT, 'eot'),
+        (curses.ascii.CR, 'newline'),
+        (curses.ascii.NL, 'newline'),
+        # (curses.ascii.HT, 'mode_set'),
+        # (curses.ascii.TAB, 'mode_set'),
+        # (curses.ascii.DC2, 'mode_set'),
+        # (curses.ascii.ESC, 'mode_set'),
+        (curses.KEY_BACKSPACE, 'backspace'),
+        (curses.KEY_DOWN, 'noop'),
+        (curses.KEY_END, 'line_position'),
+        (curses.KEY_HOME, 'line_position'),
+        (curses.KEY_LEFT, 'line_position'),
+        (curses.KEY_RIGHT, 'line_position'),
+        (curses.KEY_UP, 'mode_set'),
+    )
 
     def __init__(self, terminal: pycom.terminal.Terminal):
         self.interface = terminal.interface
@@ -45,45 +97,33 @@ class Command:
         self.logger: logging.Logger = logging.getLogger(
             self.__class__.__name__)
         self.terminal: pycom.terminal.Terminal = terminal
-        self._map: Dict[int, Callable[[int], bool]] = {
-            curses.ascii.BEL: self.mode_set,
-            curses.ascii.EOT: self.eot,
-            curses.ascii.CR: self.newline,
-            curses.ascii.NL: self.newline,
-            # curses.ascii.HT: self.mode_set,
-            # curses.ascii.TAB: self.mode_set,
-            # curses.ascii.DC2: self.mode_set,
-            # curses.ascii.ESC: self.mode_set,
-            curses.KEY_BACKSPACE: self.backspace,
-            curses.KEY_DOWN: self.noop,
-            curses.KEY_END: self.line_position,
-            curses.KEY_HOME: self.line_position,
-            curses.KEY_LEFT: self.line_position,
-            curses.KEY_RIGHT: self.line_position,
-            curses.KEY_UP: self.mode_set,
-        }
+        self._dispatch: List[Optional[Callable[[int], bool]]] = (
+            [None] * KEY_NB)
+        for key, name in self._MAP_TEMPLATE:
+            self._dispatch[key] = getattr(self, name)
 
     def __call__(self, key: int) -> bool:
         ret = True
-        if not curses.ascii.iscntrl(key) and not curses.ascii.ismeta(key):
-            self.terminal.line_current += chr(key)
-            return ret
-        try:
-            name = f'{pycom.utils.ASCII_MAP[key]} ({key})'
-        except KeyError:
-            name = str(key)
-        try:
-            func = self._map[key]
-        except KeyError:
+        func = None
+        if 0 <= key < KEY_NB:
+            if _IS_PRINTABLE[key]:
+                self.terminal.line_current.write(_CHR[key])
+                return ret
+            func = self._dispatch[key]
+        if func is None:
             self.interface.write(
-                'error', f'Line functionality {name} not implemented yet')
+                'error',
+                f'Line functionality {_key_name(key)} not implemented yet')
             self.logger.warning('Command %s not implemented', key)
             return False
-        self.logger.debug('Processing command: %s - %s', name, func.__name__)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug('Processing command: %s - %s', _key_name(key),
+                              func.__name__)
         if not func(key):
             self.interface.write(
                 'error',
-                f'Line functionality {name} not fully implemented yet')
+                f'Line functionality {_key_name(key)} not fully implemented '
+                'yet')
             self.logger.warning('Command %s not fully implemented', key)
             ret = False
         return ret
@@ -134,25 +174,25 @@ class Command:
 
 class CommandHistory(Command):
     '''Command class when operating in "history" mode'''
+    __slots__: List[str] = []
 
-    def __init__(self, terminal: pycom.terminal.Terminal):
-        super().__init__(terminal)
-        self._map.update({
-            curses.KEY_DOWN: self.history_next,
-            curses.KEY_UP: self.history_prev,
-        })
+    _MAP_TEMPLATE = Command._MAP_TEMPLATE + (
+        (curses.KEY_DOWN, 'history_next'),
+        (curses.KEY_UP, 'history_prev'),
+    )
 
     def __call__(self, key: int) -> bool:
-        if not curses.ascii.iscntrl(key) and not curses.ascii.ismeta(key):
+        if not 0 <= key < KEY_NB:
+            return False
+        if _IS_PRINTABLE[key]:
             # The line needs to be copied not to modify in place
             line = str(self.terminal.history[self.terminal.history.pos])
-            line += chr(key)
+            line += _CHR[key]
             self.terminal.overwrite(line)
             self._mode_update(Mode.NORMAL)
             return True
-        try:
-            func = self._map[key]
-        except KeyError:
+        func = self._dispatch[key]
+        if func is None:
             return False
         return func(key)
 
@@ -194,12 +234,13 @@ class CommandHistory(Command):
 
 # class CommandSearch(Command):
 #     def __call__(self, key: int) -> bool:
-#         if not curses.ascii.iscntrl(key) and not curses.ascii.ismeta(key):
+#         if not 0 <= key < KEY_NB:
+#             return False
+#         if _IS_PRINTABLE[key]:
 #             self.terminal.search(key)
 #             return True
-#         try:
-#             func = self._map[key]
-#         except KeyError:
+#         func = self._dispatch[key]
+#         if func is None:
 #             return False
 #         return func(key)
 
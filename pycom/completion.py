@@ -1,8 +1,9 @@
 '''Basic completion implementation'''
 
+import bisect
 import logging
 import pprint
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 __author__ = 'Jimmy Durand Wesolowski'
 __copyright__ = 'Copyright (C) 2022 Jimmy Durand Wesolowski'
@@ -22,11 +23,17 @@ class Completion:
         ...
     }
     '''
+    __slots__ = ['_sorted', 'dictionary', 'logger']
+
     def __init__(self, completion_dict: Dict[str, Any]):
         self.dictionary = completion_dict
         self.logger = logging.getLogger(self.__class__.__name__)
-        self.logger.debug('Completion loadded with %s',
-                          pprint.pformat(self.dictionary))
+        # Sorted entries of each dictionary node, indexed by the node id
+        self._sorted: Dict[int, List[str]] = {}
+        self._sort()
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug('Completion loadded with %s',
+                              pprint.pformat(self.dictionary))
 
     def search(self, line: str):
         '''Complete the line based on the current content "line"'''
@@ -34,26 +41,38 @@ class Completion:
         words = line.split(' ')
         if line and line[-1] == ' ':
             self.logger.info('Completing line "%s"', line)
-            return line, self.entries(words)
+            return line, list(self._sorted[id(self._node(words))])
         self.logger.info('Completing word "%s"', words[:-1])
-        try:
-            line, word = line.rsplit(' ')
-            line += ' '
-        except ValueError:
-            word = line
-            line = ''
-        entries_all = self.entries(words[:-1])
-        entries = [item for item in entries_all if item.startswith(word)]
+        line, separator, word = line.rpartition(' ')
+        line += separator
+        entries_all = self._sorted[id(self._node(words[:-1]))]
+        # The entries starting with "word" are contiguous in the sorted list
+        start = bisect.bisect_left(entries_all, word)
+        end = start
+        while end < len(entries_all) and entries_all[end].startswith(word):
+            end += 1
+        entries = entries_all[start:end]
         self.logger.debug('Matching "%s": "%s"', words[:-1], entries)
         return line, entries
 
-    def _entries(self, dictionary, words):
-        if not words:
-            return dictionary.keys()
-        try:
-            return self._entries(dictionary[words[0]], words[1:])
-        except KeyError:
-            return dictionary.keys()
+    def _node(self, words):
+        node = self.dictionary
+        for word in words:
+            try:
+                node = node[word]
+            except (KeyError, TypeError):
+                # Unknown word, or argument list reached
+                break
+        return node
+
+    def _sort(self):
+        nodes = [self.dictionary]
+        while nodes:
+            node = nodes.pop()
+            self._sorted[id(node)] = sorted(node)
+            if isinstance(node, dict):
+                nodes.extend(value for value in node.values()
+                             if isinstance(value, (dict, list)))
 
     def entries(self, words):
         '''Return all the possible entries from "words", e.g. based on the
@@ -61,4 +80,8 @@ class Completion:
         return
         ["command_2_subcommand_1_arg1"]
         '''
-        return self._entries(self.dictionary, words)
+        node = self._node(words)
+        try:
+            return node.keys()
+        except AttributeError:
+            return node
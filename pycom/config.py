@@ -1,20 +1,18 @@
 '''Configuration helper class implementation for PyCom'''
 
 import collections
-from copy import deepcopy
 import datetime
 import io
-import json
 import logging
 import logging.config as logging_config
 import tempfile
-from typing import Any, Dict, NamedTuple, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 import serial  # type: ignore
 
 from pycom.utils import (
-    OptionalFileOrFilename, dict_update_deep, eval_math_simple,
-    project_load_json
+    OptionalFileOrFilename, compile_math_simple, dict_update_deep,
+    json_dumps, json_loads, project_load_json
 )
 
 
@@ -38,8 +36,9 @@ class Config:
     JSON file configuration if available, which can be overridden by keyword
     arguments
     '''
-    __slots__ = ['_config', 'colors', 'history_save', 'interface',
-                 'logging', 'project', 'serial']
+    __slots__ = ['_config', '_interface_exprs', 'colors', 'history_save',
+                 'interface', 'logging', 'project', 'serial']
+    INTERFACE_EXPR_KEYS = ('cols', 'lines', 'posx', 'posy')
     DEFAULT = {
         'colors': True,
         'history_save': True,
@@ -110,34 +109,34 @@ class Config:
         }
     }
     DEFAULT_CONFIG = 'config.json'
-
-    class SerialConfig:
-        '''Class for serial port configuration'''
-
-        FIELDS = [
-            'baudrate', 'bytesize', 'parity', 'port', 'ratelimit', 'stopbits'
-        ]
-        def __init__(self,
-                     baudrate: Optional[int] = None,
-                     bytesize: Optional[int]=None,
-                     parity: Optional[str] = None,
-                     port: Optional[str] = None,
-                     ratelimit: Optional[int] = None,
-                     stopbits: Optional[int] = None):
-            self.baudrate = baudrate
-            self.bytesize = bytesize
-            try:
-                self.parity = _PARITY_MAP[parity]
-            except KeyError:
-                self.parity = parity
-                pass
-            self.port = port
-            if ratelimit > self.baudrate:
-                self.ratelimit = None
-            else:
-                self.ratelimit = datetime.timedelta(
-                    microseconds=(1000000 // ratelimit))
-            self.stopbits = stopbits
+    # Serialized DEFAULT, parsed back for each instance: cheaper than a
+    # deepcopy of the nested dictionary
+    _DEFAULT_JSON = json_dumps(DEFAULT)
+
+    class SerialConfig(collections.namedtuple(
+            'SerialConfig',
+            ['baudrate', 'bytesize', 'parity', 'port', 'ratelimit',
+             'stopbits'])):
+        '''Immutable serial port configuration. The parity can be given by its
+        configuration name, and the rate-limit in bytes per second is stored
+        as the delay between two bytes, or None if it is higher than the
+        baudrate
+        '''
+        __slots__ = ()
+
+        def __new__(cls,
+                    baudrate: Optional[int] = None,
+                    bytesize: Optional[int] = None,
+                    parity: Optional[str] = None,
+                    port: Optional[str] = None,
+                    ratelimit: Optional[int] = None,
+                    stopbits: Optional[int] = None):
+            parity = _PARITY_MAP.get(parity, parity)
+            delay: Optional[datetime.timedelta] = None
+            if ratelimit <= baudrate:
+                delay = datetime.timedelta(microseconds=(1000000 // ratelimit))
+            return super().__new__(cls, baudrate, bytesize, parity, port,
+                                   delay, stopbits)
 
     def __init__(self, config_fd: OptionalFileOrFilename = None,
                  **kwargs):
@@ -147,13 +146,19 @@ class Config:
         self.logging: Dict[str, Any] = {}
         self.project: str
         self.serial: SerialConfig
-        self._config: Dict[str, Any] = deepcopy(self.DEFAULT)
+        self._config: Dict[str, Any] = json_loads(self._DEFAULT_JSON)
         self.load_file(config_fd)
         self.load_dict(kwargs)
         for key in [
                 'colors', 'history_save', 'project', 'logging', 'interface']:
             setattr(self, key, self._config[key])
         self.serial = Config.SerialConfig(**self._config['serial'])
+        # Interface expressions, parsed once to be evaluated on each resize
+        self._interface_exprs: List[Dict[str, Callable]] = [
+            {key: compile_math_simple(params[key])
+             for key in self.INTERFACE_EXPR_KEYS
+             if isinstance(params.get(key), str)}
+            for params in self.interface]
         logging_config.dictConfig(self.logging)
 
         # Logging needs to be initialized before indicating errors
@@ -180,7 +185,7 @@ class Config:
                                                       serial_values)
         except KeyError:
             pass
-        for key in Config.SerialConfig.FIELDS:
+        for key in Config.SerialConfig._fields:
             try:
                 self._config['serial'][key] = values.pop(key)
             except KeyError:
@@ -195,7 +200,7 @@ class Config:
         # pylint: disable=protected-access # type hin
         if isinstance(config_fd,
                       (io.TextIOBase, tempfile._TemporaryFileWrapper)):
-            config = json.load(config_fd)
+            config = json_loads(config_fd.read())
         else:
             filename: str = self.DEFAULT_CONFIG
             if config_fd is not None:
@@ -212,10 +217,6 @@ class Config:
         in the interface. The values should be passed as keywords in
         "format_dict" as needed
         '''
-        for params in self.interface:
-            for key in ['cols', 'lines', 'posx', 'posy']:
-                try:
-                    formatted = params[key].format(**format_dict)
-                    params[key] = eval_math_simple(formatted)
-                except AttributeError:
-                    pass
+        for params, exprs in zip(self.interface, self._interface_exprs):
+            for key, expr in exprs.items():
+                params[key] = expr(format_dict)
@@ -1,6 +1,6 @@
 '''Cursor type implementation'''
 
-from enum import Enum
+from enum import IntEnum
 
 __author__ = 'Jimmy Durand Wesolowski'
 __copyright__ = 'Copyright (C) 2022 Jimmy Durand Wesolowski'
@@ -8,7 +8,7 @@ __license__ = 'GPL v2.0'
 __version__ = '1.0'
 
 
-class CursorPos(Enum):
+class CursorPos(IntEnum):
     '''Cursor type enumeration class'''
     HOME = 1
     END = 2
@@ -1,9 +1,8 @@
 '''Basic terminal command history implementation'''
 
-import collections
 import logging
 import os
-from typing import List, Optional, Union
+from typing import List, Optional, Set, Union
 
 from pycom.utils import FileType
 
@@ -14,8 +13,10 @@ __license__ = 'GPL v2.0'
 __version__ = '1.0'
 
 
-class History(collections.UserList):
+class History(list):
     '''Terminal command history class'''
+    __slots__ = ['_entries', '_synced', 'history_file', 'history_save',
+                 'logger', 'pos']
     PROMPT = 'History {:5}: '
 
     class Error(Exception):
@@ -25,30 +26,33 @@ class History(collections.UserList):
         self.history_file: Optional[FileType] = None
         self.history_save: bool = False
         self.pos: int = 0
+        # Indicates if the history file content matches the history, allowing
+        # to only append new entries to it
+        self._synced: bool = False
         self.logger = logging.getLogger(self.__class__.__name__)
         super().__init__(*data)
+        # Set of the history entries, for a constant time lookup on append
+        self._entries: Set[str] = set(self)
         self.reset()
 
     def append(self, item: str) -> None:
         if not item:
             return
         self.logger.debug('Adding "%s"', item)
-        updated = False
-        try:
-            pos = self.data.index(item)
-            if pos != len(self.data) - 1:
-                self.logger.debug(
-                    '"%s" already in history at %d, updating its position',
-                    item, pos)
-                del self.data[pos]
-                updated = True
-            else:
-                self.logger.debug('"%s" already in history', item)
-        except ValueError:
-            updated = True
-        if not updated:
+        if item not in self._entries:
+            self._entries.add(item)
+            super().append(item)
+            self.reset()
+            self.save_append(item)
+            return
+        if self[-1] == item:
+            self.logger.debug('"%s" already in history', item)
             return
-        self.data.append(item)
+        pos = self.index(item)
+        self.logger.debug(
+            '"%s" already in history at %d, updating its position', item, pos)
+        del self[pos]
+        super().append(item)
         self.reset()
         self.save()
 
@@ -87,16 +91,20 @@ class History(collections.UserList):
             history_file = os.path.join(os.environ['HOME'], '.pycom_history')
         self.history_save = history_save
         self.history_file = history_file
+        self._synced = False
         if not self.history_save:
             return
         try:
             with open(self.history_file, encoding='ascii') as history_fd:
-                lines = [line.rstrip() for line in history_fd.readlines()]
+                self.extend(
+                    filter(None, (line.rstrip() for line in history_fd)))
         except (FileNotFoundError, OSError) as exc:
             raise self.Error(exc)
-        self.data += [line for line in lines if line]
-        self.logger.debug('History loaded:%s%s', os.linesep, os.linesep.join(
-            [f'  "{line}"' for line in self.data]))
+        self._entries.update(self)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug('History loaded:%s%s', os.linesep,
+                              os.linesep.join(f'  "{line}"'
+                                              for line in self))
         self.reset()
 
     def reset(self) -> None:
@@ -109,12 +117,31 @@ class History(collections.UserList):
         '''
         if not self.history_save or self.history_file is None:
             return
-        content = ''.join([f'{entry}{os.linesep}' for entry in self.data])
+        self._synced = False
         try:
             with open(self.history_file, 'wt', encoding='ascii') as history_fd:
-                history_fd.write(content)
+                history_fd.writelines(
+                    f'{entry}{os.linesep}' for entry in self)
+        except (FileNotFoundError, OSError) as exc:
+            raise self.Error(exc)
+        self._synced = True
+
+    def save_append(self, entry: str) -> None:
+        '''Save the new "entry" added at the end of the history, only appending
+        it to the history file when possible. Same conditions as "save" apply
+        '''
+        if not self.history_save or self.history_file is None:
+            return
+        if not self._synced:
+            self.save()
+            return
+        self._synced = False
+        try:
+            with open(self.history_file, 'at', encoding='ascii') as history_fd:
+                history_fd.write(f'{entry}{os.linesep}')
         except (FileNotFoundError, OSError) as exc:
             raise self.Error(exc)
+        self._synced = True
 
     def search(self, content: str) -> List[str]:
         '''Search the history entries matching "content"'''
@@ -8,7 +8,7 @@ __license__ = 'GPL v2.0'
 __version__ = '1.0'
 
 
-class Mode(enum.Enum):
+class Mode(enum.IntEnum):
     '''Terminal operation mode type enumeration class'''
     NORMAL = 0
     COMPLETION = 1
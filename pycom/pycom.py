@@ -1,10 +1,13 @@
 '''Main class that handles the terminal'''
 
+import concurrent.futures
+import curses
+import itertools
 import logging
 import os
 import threading
 import traceback
-from typing import Dict, List, Optional
+from typing import List, Optional
 
 import pycom.command
 import pycom.completion
@@ -27,13 +30,19 @@ __version__ = '1.0'
 NAME = 'pycom'
 
 
-TITLE_MODE = {
+# Maximum delay to wait for a key before redrawing the requested updates, in
+# milliseconds
+REDRAW_PERIOD_MS = 16
+
+_TITLES = {
     Mode.COMPLETION: 'Completion mode',
     Mode.ESCAPE: '(escaped mode) commands',
     Mode.HISTORY: 'History mode',
     Mode.NORMAL: 'Commands',
     Mode.SEARCH: 'Search mode',
 }
+# Indexed by the mode value
+TITLE_MODE = tuple(_TITLES[Mode(value)] for value in range(len(_TITLES)))
 
 
 class TerminalOperation(pycom.terminal.Terminal):
@@ -43,10 +52,17 @@ class TerminalOperation(pycom.terminal.Terminal):
                  serial_handler,
                  config: pycom.config.Config,
                  condition: threading.Event):
-        self.cmd_table: Dict[Mode, pycom.command.Command]
+        self.cmd_table: List[pycom.command.Command]
         self.condition: threading.Event = condition
         self.config = config
         self.completion: pycom.completion.Completion
+        # Indicates the display needs an update
+        self._dirty: bool = True
+        # Rendered history (or search result) lines, with the search they
+        # were rendered for (None for the history), and the highlighted index
+        self._entry_key: Optional[str] = None
+        self._entry_lines: Optional[List[pycom.term_win.TermLine]] = None
+        self._highlighted: int = -1
         self.history = pycom.history.History()
         self.interface = interface
         self.line_current: pycom.term_win.TermLine
@@ -57,7 +73,7 @@ class TerminalOperation(pycom.terminal.Terminal):
         self.serial = serial_handler
         self.window: pycom.term_win.TermWindow = window
 
-        self.cmd_table = {
+        cmd_table = {
             Mode.COMPLETION: pycom.command.Command(self),
             Mode.ESCAPE: pycom.command.Command(self),
             Mode.HISTORY: pycom.command.CommandHistory(self),
@@ -66,6 +82,9 @@ class TerminalOperation(pycom.terminal.Terminal):
             # Mode.SEARCH: pycom.command.CommandSearch(self),
             Mode.SEARCH: pycom.command.Command(self),
         }
+        # Indexed by the mode value, for the key read dispatch
+        self.cmd_table = [cmd_table[Mode(value)]
+                          for value in range(len(cmd_table))]
 
         completion_config = pycom.utils.project_load_json(
             'completion.json', NAME, default={})
@@ -99,7 +118,10 @@ class TerminalOperation(pycom.terminal.Terminal):
             return
         self.logger.info('Mode switch %s -> %s', self.mode, mode)
         self.window.clear()
+        self.window.cursor_enable(mode not in (Mode.HISTORY, Mode.SEARCH))
         self.mode = mode
+        self._dirty = True
+        self._entries_release()
         self.cmd_table[mode].start()
         self.window.title_set(TITLE_MODE[mode])
 
@@ -108,11 +130,13 @@ class TerminalOperation(pycom.terminal.Terminal):
         if self.mode == Mode.HISTORY:
             self.line_current = self.window.line_create(
                 self.history[self.history.pos], num=len(self.lines) + 1)
-        self.logger.info('Current line: %s', self.line_current)
+        content = str(self.line_current)
+        self.logger.info('Current line: %s', content)
         self.lines.append(self.line_current)
-        self.serial.write(self.line_current)
+        self.serial.write(content)
+        self._entries_release()
         try:
-            self.history.append(str(self.line_current))
+            self.history.append(content)
         except pycom.history.History.Error as exc:
             msg = f'Failed to add to history: "{exc}"'
             self.logger.warning(msg)
@@ -134,54 +158,83 @@ class TerminalOperation(pycom.terminal.Terminal):
         except KeyboardInterrupt:
             self.terminate()
             return
+        if key == curses.ERR:
+            return
         self.logger.debug('Key read: %d', key)
         self.cmd_table[self.mode](key)
+        self._dirty = True
 
     def reset(self):
         raise NotImplementedError
 
     def terminate(self) -> None:
         self.condition.set()
+        self.serial.wake()
 
     def update(self):
-        self.window.cursor_enable(True)
-        if self.mode == Mode.HISTORY:
-            self.window.cursor_enable(False)
-            lines = []
-            for idx, line in enumerate(self.history):
-                line = self.window.line_create(str(line), num=idx + 1)
-                if idx == self.history.pos:
-                    line.highlight()
-                lines.append(line)
-            self.window.write(lines)
+        if not self._dirty:
             return
-        if self.mode == Mode.SEARCH:
-            self.window.cursor_enable(False)
-            lines = []
-            for idx, line in enumerate(self.history.search(self.line_current)):
-                line = self.window.line_create(str(line), num=idx + 1)
-                if idx == self.history.pos:
-                    line.highlight()
-                lines.append(line)
-            self.window.write(lines)
+        self._dirty = False
+        self.interface.request_redraw()
+        if self.mode in (Mode.HISTORY, Mode.SEARCH):
+            self._entries_write()
             return
-        self.window.write(self.lines + [self.line_current])
+        # Only the lines fitting in the window can be displayed, each one
+        # taking at least a window line
+        start = max(0, len(self.lines) - self.window.dim[0] + 1)
+        self.window.write(itertools.chain(self.lines[start:],
+                                          (self.line_current,)))
+
+    def _entries_release(self) -> None:
+        '''Release the rendered history entry lines, to render them again'''
+        if self._entry_lines is not None:
+            self.window.lines_release(self._entry_lines)
+            self._entry_lines = None
+
+    def _entries_write(self) -> None:
+        '''Write the history entries, or the search result in search mode,
+        highlighting the one at the history position. The lines are rendered
+        again only if the history or the searched content changed
+        '''
+        key = None
+        if self.mode == Mode.SEARCH:
+            key = str(self.line_current)
+        if self._entry_lines is None or key != self._entry_key:
+            self._entries_release()
+            entries = self.history if key is None else self.history.search(key)
+            self._entry_lines = self.window.lines_get(entries)
+            self._entry_key = key
+            self._highlighted = -1
+        lines = self._entry_lines
+        pos = self.history.pos
+        if pos != self._highlighted:
+            if 0 <= self._highlighted < len(lines):
+                lines[self._highlighted].normal()
+            if 0 <= pos < len(lines):
+                lines[pos].highlight()
+            self._highlighted = pos
+        self.window.write(lines)
 
     def write(self, lines: List[str]):
-        start = len(self.lines)
+        if not lines:
+            return
+        self._dirty = True
         curline = None
-        if lines[-1][-1] != os.linesep:
+        if not lines[-1].endswith(os.linesep):
             curline = lines[-1]
             lines = lines[:-1]
-        for idx, line in enumerate(lines):
-            self.lines.append(
-                self.window.line_create(line, num=start + idx + 1))
+        self.lines.extend(self.window.lines_get(lines, len(self.lines) + 1))
         if curline is None:
             return
         self.line_current = self.window.line_create(
             curline, num=len(self.lines) + 1)
 
 
+def _file_readlines(filename: FileType) -> List[str]:
+    with open(filename, encoding='ascii') as input_fd:
+        return input_fd.readlines()
+
+
 class PyCom:
     '''Terminal threads and interface handling'''
     def __init__(self, config=None):
@@ -208,14 +261,17 @@ class PyCom:
             opterm.write(self.input_content)
 
         interface.clear()
+        # Stop waiting for a key regularly, to redraw the serial updates
+        interface.windows['command'].timeout(REDRAW_PERIOD_MS)
         serial_handler.start()
         while not event.is_set():
             opterm.update()
-            self.logger.debug('Queue %d',
-                              interface.windows['command'].queue.qsize())
-            interface.redraw()
-            if interface.windows['error'].queue.qsize():
-                interface.windows['error'].clear()
+            if interface.redraw_requested():
+                self.logger.debug('Pending %s',
+                                  interface.windows['command'].pending())
+                interface.redraw()
+                if interface.windows['error'].pending():
+                    interface.windows['error'].clear()
             opterm.read()
         interface.terminate()
 
@@ -224,10 +280,12 @@ class PyCom:
         command terminal
         '''
         self.input_content = []
-        if input_files is not None:
-            for filename in input_files:
-                with open(filename, encoding='ascii') as input_fd:
-                    self.input_content += input_fd.readlines()
+        if input_files:
+            # Read the files concurrently, keeping their order
+            with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=min(8, len(input_files))) as executor:
+                self.input_content = list(itertools.chain.from_iterable(
+                    executor.map(_file_readlines, input_files)))
 
         stdin_lines = stdin_readlines()
         if stdin_lines is not None:
@@ -1,16 +1,21 @@
 '''Serial communication handling class implementation'''
 
+import collections
 import datetime
 import logging
 import os
 import queue
+import select
+import selectors
 import threading
 import time
-from typing import List, Union
+from typing import Deque, List, Optional, Union
 
 import serial  # type: ignore
 
+from pycom.spsc import SPSCQueue
 import pycom.term_win
+from pycom.utils import chunks
 
 __author__ = 'Jimmy Durand Wesolowski'
 __copyright__ = 'Copyright (C) 2022 Jimmy Durand Wesolowski'
@@ -18,80 +23,188 @@ __license__ = 'GPL v2.0'
 __version__ = '1.0'
 
 
+_LINESEP = os.linesep.encode('ascii')
+# Received bytes to drop: the non-ASCII ones and the control characters other
+# than the tabulation and the line endings
+_KEEP = frozenset(range(0x20, 0x7f)) | frozenset(b'\t\n\r')
+_DROP = bytes(byte for byte in range(256) if byte not in _KEEP)
+
+
 class SerialHandler(threading.Thread):
     '''Thread class handling the serial communication retrieval and
     forwarding
     '''
+    # Period of the rate-limited writes, in nanoseconds: the bytes allowed
+    # during this period are written at once
+    RATELIMIT_PERIOD_NS = 10000000
+    # Maximum size of a single serial port read
+    READ_SIZE = 4096
+
     def __init__(self, interface, config, condition):
         super().__init__()
         self.config = config
         self.condition = condition
         self.interface = interface
         self.logger = logging.getLogger(self.__class__.__name__)
-        self.queue: queue.Queue = queue.Queue()
-        self.ratelimit: datetime.datetime.timedelta
+        # Info logging status, checked once the thread starts
+        self._log_info: bool = False
+        # Written by the interface thread, read by the serial thread only
+        self.queue: SPSCQueue = SPSCQueue()
+        self.ratelimit: Optional[datetime.timedelta]
         self.ratelimit = self.config.serial.ratelimit
+        # Delay between two bytes in nanoseconds, 0 if not rate-limited
+        self._ratelimit_ns: int = 0
+        if self.ratelimit:
+            self._ratelimit_ns = 1000 * (
+                self.ratelimit // datetime.timedelta(microseconds=1))
         self.serial_port = None
+        # Received bytes of the current incomplete line
+        self._rx_buf: bytearray = bytearray()
+        # Serial port file descriptor, read and written directly
+        self._fd: int = -1
+        # The queue writers and the termination wake the serial thread up
+        # through this pipe
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+
+    def _port_write(self, content: bytes) -> None:
+        '''Write all the "content" on the non-blocking serial port, waiting
+        for it to be writable if needed
+        '''
+        view = memoryview(content)
+        while view:
+            try:
+                written = os.write(self._fd, view)
+            except BlockingIOError:
+                select.select([], [self._fd], [])
+                continue
+            view = view[written:]
 
-    def _serial_write(self, data: str):
-        content = data.encode('ascii')
-        if not self.config.serial.ratelimit:
-            self.serial_port.write(content)
+    def _serial_write(self, content: bytes):
+        if not self._ratelimit_ns:
+            self._port_write(content)
             return
-        for char in content:
-            end = datetime.datetime.utcnow() + self.ratelimit
-            self.serial_port.write(char)
-            delay = (end - datetime.datetime.utcnow()).total_seconds()
-            self.logger.warning('Delay: %f %s', delay, self.ratelimit)
+        size = max(1, self.RATELIMIT_PERIOD_NS // self._ratelimit_ns)
+        end = time.monotonic_ns()
+        for chunk in chunks(content, size):
+            self._port_write(chunk)
+            end += len(chunk) * self._ratelimit_ns
+            delay = end - time.monotonic_ns()
             if delay > 0:
-                time.sleep(delay)
+                time.sleep(delay / 1e9)
 
-    def _serial_get(self) -> Union[None, str]:
+    def _serial_get(self) -> Optional[bytes]:
         try:
-            data = self.serial_port.read_until()
-        except serial.SerialException:
+            data = os.read(self._fd, self.READ_SIZE)
+        except BlockingIOError:
+            return None
+        except OSError as exc:
+            self.logger.warning('error reading serial: %s', exc)
+            self._selector.unregister(self._fd)
             return None
         if not data:
+            self.logger.warning('Serial port %s closed', self.serial_port.port)
+            self._selector.unregister(self._fd)
             return None
-        return data.decode('ascii', 'ignore')
+        return data
 
-    def _queue_get(self) -> None:
-        try:
-            data = self.queue.get_nowait()
-        except queue.Empty:
+    def _lines_add(self, window: pycom.term_win.TermWindow,
+                   lines: Deque[pycom.term_win.TermLine],
+                   data: bytes) -> None:
+        '''Add the received "data", which can hold several lines, to the
+        serial window, moving each completed line to "lines". The bytes of
+        the incomplete line are kept to be decoded once complete, and
+        displayed meanwhile. The non-printable bytes are dropped
+        '''
+        rx_buf = self._rx_buf
+        rx_buf += data.translate(None, _DROP)
+        start = 0
+        end = rx_buf.find(b'\n')
+        while end >= 0:
+            lines.append(window.line_create(
+                rx_buf[start:end].decode('ascii').rstrip()))
+            start = end + 1
+            end = rx_buf.find(b'\n', start)
+        del rx_buf[:start]
+        line_current = window.line_create(
+            rx_buf.decode('ascii').rstrip())
+        if self._log_info:
+            self.logger.info('%d lines', len(lines))
+        window.write(list(lines) + [line_current])
+        self.interface.request_redraw()
+
+    def _queue_drain(self) -> None:
+        '''Send all the queued content on the serial port at once'''
+        contents = []
+        while True:
+            try:
+                contents.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        if not contents:
             return
-        self.logger.info('Sending "%s" on serial', data)
+        if self._log_info:
+            self.logger.info('Sending %s on serial', contents)
         try:
-            self._serial_write(str(data) + os.linesep)
-        except (TypeError, ValueError, serial.SerialException) as exc:
+            self._serial_write(_LINESEP.join(contents) + _LINESEP)
+        except OSError as exc:
             self.logger.warning('error writing serial: %s', exc)
 
+    def _wake_drain(self) -> None:
+        try:
+            os.read(self._wake_r, 4096)
+        except BlockingIOError:
+            pass
+
     def run(self) -> None:
         self.logger.debug('Starting serial')
+        self._log_info = self.logger.isEnabledFor(logging.INFO)
         window = self.interface.windows['serial']
+        # pyserial only opens and configures the port, its non-blocking file
+        # descriptor being read once readable, and written, directly
         self.serial_port = serial.Serial(self.config.serial.port,
-                                         self.config.serial.baudrate,
-                                         timeout=.1)
-        lines: List[pycom.term_win.TermLine] = []
+                                         self.config.serial.baudrate)
+        self._fd = self.serial_port.fileno()
+        self._selector.register(self._fd, selectors.EVENT_READ)
+        # Only the lines fitting in the window are kept
+        lines: Deque[pycom.term_win.TermLine] = collections.deque(
+            maxlen=window.dim[0])
         while not self.condition.is_set():
-            self._queue_get()
-            data = self._serial_get()
-            if data is None:
-                continue
-            if not lines:
-                lines.append(window.line_create(data.rstrip()))
-            else:
-                lines[-1] += data.rstrip()
-            if data[-1] == '\n':
-                lines.append(window.line_create())
-            self.logger.info('%d lines', len(lines))
-            window.write(lines)
-            self.interface.redraw()
+            for key, _ in self._selector.select():
+                if key.fd == self._wake_r:
+                    self._wake_drain()
+                    self._queue_drain()
+                    continue
+                data = self._serial_get()
+                if data is not None:
+                    self._lines_add(window, lines, data)
 
     def write(self, content: Union[bytes, bytearray, List[str], str]) -> None:
         '''Write to the serial port and serial terminal'''
         if isinstance(content, list):
             content = os.linesep.join(content)
-        if isinstance(content, (bytearray, bytes)):
-            content = content.decode('utf-8', 'ignore')
-        self.queue.put(content)
+        if not isinstance(content, (bytearray, bytes)):
+            try:
+                content = str(content).encode('ascii')
+            except UnicodeEncodeError as exc:
+                self.logger.warning('error writing serial: %s', exc)
+                return
+        try:
+            self.queue.put_nowait(bytes(content))
+        except queue.Full:
+            self.logger.warning('Serial queue full, dropping "%s"', content)
+            return
+        self.wake()
+
+    def wake(self) -> None:
+        '''Wake the serial thread up, to send the queued content or check the
+        termination condition
+        '''
+        try:
+            os.write(self._wake_w, b'\0')
+        except BlockingIOError:
+            # The pipe is full: the serial thread has wake-ups pending already
+            pass
@@ -0,0 +1,63 @@
+'''Single producer, single consumer queue implementation'''
+
+import queue
+from typing import Any, List
+
+__author__ = 'Jimmy Durand Wesolowski'
+__copyright__ = 'Copyright (C) 2022 Jimmy Durand Wesolowski'
+__license__ = 'GPL v2.0'
+__version__ = '1.0'
+
+
+class SPSCQueue:
+    '''Lock-free queue for exactly one producer thread and one consumer
+    thread, based on a ring buffer with a power of two capacity.
+    The producer only updates the tail, and the consumer only the head, each
+    update being atomic under the interpreter lock. The "queue" module Empty
+    and Full exceptions are raised, for a drop-in "put_nowait"/"get_nowait"
+    replacement of "queue.Queue"
+    '''
+    __slots__ = ['_buf', '_head', '_mask', '_tail']
+
+    def __init__(self, capacity: int = 1024):
+        if capacity <= 0 or capacity & (capacity - 1):
+            raise ValueError(f'Capacity {capacity} is not a power of two')
+        self._buf: List[Any] = [None] * capacity
+        self._head: int = 0
+        self._mask: int = capacity - 1
+        self._tail: int = 0
+
+    def __len__(self) -> int:
+        return self._tail - self._head
+
+    def empty(self) -> bool:
+        '''Indicates if the queue is empty'''
+        return self._head == self._tail
+
+    def get_nowait(self) -> Any:
+        '''Remove and return the oldest item of the queue. Raises queue.Empty
+        if there is none. To be called from the consumer thread only
+        '''
+        head = self._head
+        if head == self._tail:
+            raise queue.Empty
+        idx = head & self._mask
+        item = self._buf[idx]
+        # Release the reference before handing the slot back to the producer
+        self._buf[idx] = None
+        self._head = head + 1
+        return item
+
+    def put_nowait(self, item: Any) -> None:
+        '''Add "item" to the queue. Raises queue.Full if the queue is full. To
+        be called from the producer thread only
+        '''
+        tail = self._tail
+        if tail - self._head > self._mask:
+            raise queue.Full
+        self._buf[tail & self._mask] = item
+        self._tail = tail + 1
+
+    def qsize(self) -> int:
+        '''Returns the number of items in the queue'''
+        return self._tail - self._head
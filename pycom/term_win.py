@@ -1,10 +1,15 @@
 '''Handling of the curses interface, windows, and line displaying'''
 import collections
+import collections.abc
 import curses
+import functools
 import logging
 import os
-import queue
-from typing import Dict, Iterable, List, Optional, SupportsIndex, Tuple, Union
+import threading
+from typing import (
+    Callable, Dict, Iterable, Iterator, List, Optional, SupportsIndex, Tuple,
+    Union
+)
 
 import pycom.config
 from pycom.cursorpos import CursorPos
@@ -19,39 +24,68 @@ __version__ = '1.0'
 
 
 ScreenPos = Tuple[int, int]
+# Window row as (posy, attr, line)
+ScreenRow = Tuple[int, int, str]
 OptionalTermlines = Optional[
     Union[str, List[str], 'TermLine', List['TermLine'],
-          List[Union['TermLine', str]]]
+          List[Union['TermLine', str]], Iterator[Union['TermLine', str]]]
 ]
 Window = Union[pycom.window.Window, 'curses._CursesWindow']
 
 
+@functools.lru_cache(maxsize=4096)
+def _prompt_format(prompt_fmt: str, num: int) -> str:
+    '''Returns the "prompt_fmt" prompt formatted with "num", the line numbers
+    being mostly the same from a window update to the other
+    '''
+    return prompt_fmt.format(num)
+
+
 class TermLine:
     '''Basic implemtation of a window editable line'''
     __slots__ = (
-        '_content', 'attr', 'logger', 'num', 'pos',
-        'prompt', 'window_cols', 'window_lines'
+        '_chunked', '_chunks', '_gap', '_hash', '_head', '_joined', '_len',
+        '_prompt', '_prompt_len', '_tail', '_version', 'attr', 'logger',
+        'num', 'pos', 'window_cols', 'window_lines'
     )
 
     PROMPT_FMT = 'line {:5}: '
 
     def __init__(self, window_lines: int, window_cols: int,
                  content: Optional[str] = None):
-        self._content: str = content if content is not None else ''
-        if not isinstance(self._content, str):
+        if content is None:
+            content = ''
+        if not isinstance(content, str):
             raise AssertionError
+        # Gap buffer: the content written at the gap position "_gap" is
+        # appended to the "_head" fragments, followed by the "_tail" text.
+        # The whole content is only joined when needed, in "_joined", to
+        # avoid copying the line on each key
+        self._head: List[str] = [content]
+        self._tail: str = ''
+        self._gap: int = len(content)
+        self._joined: Optional[str] = content
+        self._len: int = len(content)
+        # Content hash, computed on demand until the next modification
+        self._hash: Optional[int] = None
+        # Displayed content version, bumped on each modification, and the
+        # content split for this version. "_chunked" is the length of the
+        # displayed text left untouched since the split, whose full rows are
+        # kept when splitting the next version
+        self._version: int = 0
+        self._chunks: Tuple[int, List[str]] = (-1, [])
+        self._chunked: int = 0
         self.attr: int = 0
         self.window_cols: int = window_cols
         self.window_lines: int = window_lines
         self.logger: logging.Logger = logging.getLogger(
             self.__class__.__name__)
-        self.pos: int = len(self._content)
-        self.prompt: str = ''
+        self.pos: int = self._len
+        self._prompt: str = ''
+        self._prompt_len: int = 0
 
     def __add__(self, content: Union[str, 'TermLine']):
-        start, end = self._content[:self.pos], self._content[self.pos:]
-        self._content = start + str(content) + end
-        self.pos += len(content)
+        self.write(str(content))
         return self
 
     def __contains__(self, content: Union[str, 'TermLine']):
@@ -61,8 +95,6 @@ class TermLine:
 
     def __eq__(self, termline):
         try:
-            if not isinstance(self._content, str):
-                raise AssertionError
             return self._content == termline._content
         except AttributeError as exc:
             if not isinstance(termline, str):
@@ -70,58 +102,125 @@ class TermLine:
             return self._content == termline
 
     def __hash__(self):
-        return hash(self._content)
+        if self._hash is None:
+            self._hash = hash(self._content)
+        return self._hash
 
     def __getitem__(self, idx: Union[SupportsIndex, slice]):
         return self._content[idx]
 
     def __len__(self):
-        return len(self._content)
+        return self._len
 
     def __repr__(self):
         if self._content:
             content = self._content
             if len(content) > 57:
                 content = f'{content[len(content) - 57:]}...'
-            return (f'[{self.__class__.__name__} {len(self.content)} line(s) '
+            return (f'[{self.__class__.__name__} {self.line_count} line(s) '
                     f'"{content}"]')
         return f'[{self.__class__.__name__} empty]'
 
     def __str__(self):
         return self._content
 
+    @property
+    def _content(self) -> str:
+        if self._joined is None:
+            head = ''.join(self._head)
+            self._head = [head]
+            self._joined = head + self._tail
+        return self._joined
+
+    def _gap_move(self) -> None:
+        '''Move the gap to the current position, if needed'''
+        if self._gap == self.pos:
+            return
+        content = self._content
+        self._head = [content[:self.pos]]
+        self._tail = content[self.pos:]
+        self._gap = self.pos
+
     def _update_pos(self, pos: int) -> ScreenPos:
         if pos < 0:
             self.pos = max(0, self.pos + pos)
         elif pos > 0:
-            self.pos = min(self.pos + pos, len(self._content))
+            self.pos = min(self.pos + pos, self._len)
         return self.screen_pos
 
+    def _pos_end(self) -> ScreenPos:
+        self.pos = self._len
+        return self.screen_pos
+
+    def _pos_home(self) -> ScreenPos:
+        self.pos = 0
+        return self.screen_pos
+
+    def _pos_left(self) -> ScreenPos:
+        return self._update_pos(-1)
+
+    def _pos_right(self) -> ScreenPos:
+        return self._update_pos(1)
+
+    # "update_pos" handler of each cursor position
+    _POS_UPDATES: Dict[CursorPos, Callable[['TermLine'], ScreenPos]] = {
+        CursorPos.END: _pos_end,
+        CursorPos.HOME: _pos_home,
+        CursorPos.LEFT: _pos_left,
+        CursorPos.RIGHT: _pos_right,
+    }
+
     def bold(self) -> None:
         '''Makes the line bold'''
         self.attr |= curses.A_BOLD
 
     @property
     def content(self) -> List[str]:
-        '''Returns the line content split according to the available space'''
-        if not isinstance(self._content, str):
-            raise AssertionError
-        if self.pos < 0 or self.pos > len(self._content + self.prompt):
-            raise AssertionError
-        return list(
-            pycom.utils.chunks(self.prompt + self._content, self.window_cols))
+        '''Returns the line content split according to the available space.
+        The returned list is cached until the line is modified, and must not
+        be altered
+        '''
+        if __debug__:
+            if self.pos < 0 or self.pos > self._len + self._prompt_len:
+                raise AssertionError
+        version, chunks = self._chunks
+        if version != self._version:
+            cols = self.window_cols
+            rows = min(self._chunked // cols, len(chunks))
+            start = rows * cols
+            if start < self._prompt_len:
+                tail = self._prompt[start:] + self._content
+            else:
+                tail = self._content[start - self._prompt_len:]
+            chunks = chunks[:rows]
+            chunks.extend(pycom.utils.chunks(tail, cols))
+            self._chunks = (self._version, chunks)
+            self._chunked = self._prompt_len + self._len
+        return chunks
 
     def delete(self, num: int = 1) -> ScreenPos:
         '''Deletes up to "num" character before the current position in the
         line and returns the new position in the line
         '''
         self.logger.debug('Deleting %d character from pos %d', num, self.pos)
-        if num > len(self._content):
-            num = len(self._content)
-        self._content = (self._content[:self.pos - num]
-                         + self._content[self.pos:])
-        if not isinstance(self._content, str):
-            raise AssertionError
+        num = min(num, self.pos)
+        if num <= 0:
+            return self.screen_pos
+        self._gap_move()
+        self._chunked = min(self._chunked, self._prompt_len + self.pos - num)
+        head = self._head
+        remaining = num
+        while remaining:
+            fragment = head.pop()
+            if len(fragment) > remaining:
+                head.append(fragment[:-remaining])
+                break
+            remaining -= len(fragment)
+        self._gap -= num
+        self._len -= num
+        self._joined = None
+        self._hash = None
+        self._version += 1
         return self._update_pos(-num)
 
     def get(self, maximum: Optional[int] = None) -> List[str]:
@@ -131,8 +230,15 @@ class TermLine:
         '''
         if maximum is None:
             maximum = self.window_lines
-        start = max(0, len(self.content) - maximum)
-        return self.content[start:]
+        content = self.content
+        return content[max(0, len(content) - maximum):]
+
+    @property
+    def line_count(self) -> int:
+        '''Returns the number of window lines needed to display the line,
+        without splitting it
+        '''
+        return -(-(self._prompt_len + self._len) // self.window_cols)
 
     def highlight(self):
         '''Highlight the line'''
@@ -142,18 +248,46 @@ class TermLine:
         '''Return the line to its default style value'''
         self.attr = curses.A_NORMAL
 
+    @property
+    def prompt(self) -> str:
+        '''Prompt displayed before the line content'''
+        return self._prompt
+
+    @prompt.setter
+    def prompt(self, prompt: str) -> None:
+        self._prompt = prompt
+        self._prompt_len = len(prompt)
+        self._version += 1
+        self._chunked = 0
+
     def prompt_set(self, num: int = 0) -> None:
         '''Set the prompt to the given index (default 0) using the
         "PROMPT_FMT"'''
-        self.prompt = self.PROMPT_FMT.format(num)
+        self.prompt = _prompt_format(self.PROMPT_FMT, num)
+
+    def reset(self, content: str = '') -> None:
+        '''Reset the line to a new line holding "content", to reuse it'''
+        if not isinstance(content, str):
+            raise AssertionError
+        self._head = [content]
+        self._tail = ''
+        self._gap = len(content)
+        self._joined = content
+        self._len = len(content)
+        self._hash = None
+        self._version += 1
+        self._chunked = 0
+        self.attr = 0
+        self.pos = self._len
+        self._prompt = ''
+        self._prompt_len = 0
 
     @property
     def screen_pos(self) -> ScreenPos:
         '''Returns the position of the line according to the window
         restrictions
         '''
-        pos = self.pos + len(self.prompt)
-        return (pos // self.window_cols, pos % self.window_cols)
+        return divmod(self.pos + self._prompt_len, self.window_cols)
 
     def split(self, *args, **kwargs):
         '''Perform a "split" on the line content'''
@@ -167,29 +301,28 @@ class TermLine:
                    pos: Union[CursorPos, int]) -> ScreenPos:
         '''Update the position in the line'''
         self.logger.debug('Moving cursor at %s', pos)
+        # CursorPos is an IntEnum: check it before any other integer
+        if isinstance(pos, CursorPos):
+            return self._POS_UPDATES[pos](self)
         if isinstance(pos, int):
             return self._update_pos(pos)
-
-        if pos == CursorPos.HOME:
-            self.pos = 0
-            return self.screen_pos
-        if pos == CursorPos.END:
-            self.pos = len(self._content)
-            return self.screen_pos
-        if pos == CursorPos.LEFT:
-            return self._update_pos(-1)
-        if pos == CursorPos.RIGHT:
-            return self._update_pos(1)
         raise AssertionError(f'Unknown position {pos}')
 
     def write(self, content: str) -> ScreenPos:
         '''Write additional content in the line, adding at the current
         position, and moving the current position accordingly
         '''
-        self._content = (self._content[:self.pos] + content
-                         + self._content[self.pos:])
-        if not isinstance(self._content, str):
-            raise AssertionError
+        if __debug__:
+            if not isinstance(content, str):
+                raise AssertionError
+        self._gap_move()
+        self._chunked = min(self._chunked, self._prompt_len + self.pos)
+        self._head.append(content)
+        self._gap += len(content)
+        self._len += len(content)
+        self._joined = None
+        self._hash = None
+        self._version += 1
         return self._update_pos(len(content))
 
 
@@ -197,17 +330,27 @@ class TermWindow:
     '''Terminal window implementation using curses'''
 
     __slots__ = [
-        '_title', 'content', 'cursor', 'dim', 'logger',
-        'name', 'position', 'posx', 'posy', 'prompt',
-        'queue', 'window'
+        '_line_pool', '_pending', '_pending_lock', '_shadow', '_title',
+        'content', 'cursor', 'dim', 'logger', 'name', 'position', 'posx',
+        'posy', 'prompt', 'window'
     ]
+    # Maximum number of released lines kept for reuse
+    LINE_POOL_SIZE = 256
 
     # pylint: disable=too-many-arguments
     def __init__(self, name: str, lines: int, cols: int, posy: int, posx: int):
         self.content = None
         self.cursor: bool = False
         self.dim = (lines, cols)
-        self.queue: queue.Queue
+        # Released lines, reused by "line_create"
+        self._line_pool: List[TermLine] = []
+        # Last written content, waiting for the next redraw. Only the last
+        # write is displayed, so it simply replaces any previous one
+        self._pending: Optional[Tuple[List[ScreenRow], ScreenPos]] = None
+        self._pending_lock = threading.Lock()
+        # Rows displayed by the last redraw and still on screen, per window
+        # line, to only redraw the modified ones
+        self._shadow: List[Optional[ScreenRow]] = [None] * lines
         self.name: str = name
         self.position: Optional[Tuple[int, int]] = (0, 0)
         self.prompt: bool = False
@@ -218,7 +361,6 @@ class TermWindow:
             f'{self.__class__.__name__} {self.name}')
         self.logger.debug('%s window: %dx%d@%dx%d', self.name, *self.dim,
                           *self.window.getbegyx())
-        self.queue = queue.Queue()
         self.window.keypad(True)
         self.window.move(0, 0)
 
@@ -226,7 +368,8 @@ class TermWindow:
         if lines is None:
             return []
         items: Iterable
-        if isinstance(lines, (List, collections.UserList)):
+        if isinstance(lines, (list, collections.UserList,
+                              collections.abc.Iterator)):
             items = lines
         else:
             items = [lines]
@@ -242,6 +385,7 @@ class TermWindow:
         '''Clear the terminal display'''
         self.logger.debug('Clearing')
         self.window.clear()
+        self._shadow = [None] * self.dim[0]
         self.write()
 
     def cursor_enable(self, status: bool = True) -> None:
@@ -260,7 +404,11 @@ class TermWindow:
         '''
         if line is None:
             line = ''
-        termline = TermLine(*self.dim, content=str(line))
+        if self._line_pool:
+            termline = self._line_pool.pop()
+            termline.reset(str(line))
+        else:
+            termline = TermLine(*self.dim, content=str(line))
         if self.prompt:
             termline.prompt_set(num)
         if prompt is not None:
@@ -271,8 +419,20 @@ class TermWindow:
         '''Create new lines in the window based on the window properties,
         starting their indexing from "num_start"
         '''
-        return [self.line_create(line, num=idx + num_start)
-                for idx, line in enumerate(lines)]
+        return [self.line_create(line, num=num)
+                for num, line in enumerate(lines, num_start)]
+
+    def lines_release(self, lines: List[TermLine]) -> None:
+        '''Release the "lines" created by this window and no longer used, for
+        "line_create" to reuse them. The lines must not be used anymore, nor
+        be displayed after the next "write"
+        '''
+        room = self.LINE_POOL_SIZE - len(self._line_pool)
+        self._line_pool.extend(lines[:room])
+
+    def pending(self) -> bool:
+        '''Indicates if written content is waiting for a redraw'''
+        return self._pending is not None
 
     def prompt_enable(self, enable: bool = True):
         '''Enable or disable a prompt for this window according to "enable"'''
@@ -282,38 +442,54 @@ class TermWindow:
         '''Read from the terminal window'''
         return self.window.getch()
 
-    def redraw(self) -> None:
+    def cursor_place(self) -> None:
+        '''Place the terminal cursor at the window cursor position'''
+        self.window.move(*self.position)
+        self.window.refresh()
+
+    def redraw(self) -> bool:
         '''Redraw the current window. Required to display the newly written
-        lines with "write"
+        lines with "write". Returns False without redrawing if nothing was
+        written since the last redraw
         '''
-        self.logger.info('Redrawing (%d)', self.queue.qsize())
-        if self.queue.qsize():
-            while True:
-                try:
-                    self.content, self.position = self.queue.get_nowait()
-                except queue.Empty:
-                    break
+        with self._pending_lock:
+            pending, self._pending = self._pending, None
+        if pending is None:
+            return False
+        self.content, self.position = pending
         self.logger.debug('Redrawing %s, %s', self.content, self.position)
-        posy = 0
-        curx = 0
-        if self.content is not None:
-            for termline, screenlines in reversed(self.content):
-                for line in screenlines:
-                    self.logger.debug('Writing %dx%d: %s', posy, 0, line)
-                    try:
-                        self.window.addstr(posy, 0, line, termline.attr)
-                    except (curses.error, ValueError) as exc:
-                        self.logger.warning('Failed to write "%s" at %d: %s',
-                                            line, posy, exc)
-                    self.window.clrtoeol()
-                    posy += 1
-                _, curx = termline.screen_pos
-        self.position = (posy - 1, curx)
+        window = self.window
+        shadow = self._shadow
+        last = len(self.content) - 1
+        for idx, row in enumerate(self.content):
+            posy, attr, line = row
+            # The last row is always drawn, placing the curses cursor after
+            # the content as expected for the cursor and "clrtobot"
+            if idx != last and shadow[posy] == row:
+                continue
+            try:
+                window.addstr(posy, 0, line, attr)
+                shadow[posy] = row
+            except (curses.error, ValueError) as exc:
+                self.logger.warning('Failed to write "%s" at %d: %s',
+                                    line, posy, exc)
+                shadow[posy] = None
+            window.clrtoeol()
+        # The rows from the last one are cleared by "clrtobot" below
+        start = self.content[-1][0] if self.content else 0
+        shadow[start:] = [None] * (len(shadow) - start)
         if self.cursor:
             self.logger.debug('Setting cursor')
-            self.window.move(*self.position)
-        self.window.refresh()
-        self.window.clrtobot()
+            window.move(*self.position)
+        window.refresh()
+        window.clrtobot()
+        return True
+
+    def timeout(self, delay: int) -> None:
+        '''Make "read" wait at most "delay" milliseconds for a key, returning
+        curses.ERR (-1) if none came. A negative delay waits indefinitely
+        '''
+        self.window.timeout(delay)
 
     def title_set(self, title: str) -> None:
         '''Set the window title to "title"'''
@@ -332,25 +508,35 @@ class TermWindow:
             quota -= 1
         else:
             self.logger.debug('No title set')
-        if termlines is not None:
+        if self.logger.isEnabledFor(logging.DEBUG):
             self.logger.debug('Updating %s%s%s', self._title, os.linesep,
-                              os.linesep.join([f'  "{line}"'
-                                               for line in termlines]))
-        else:
-            self.logger.debug('Updating %s', self._title)
-        content = []
+                              os.linesep.join(f'  "{line}"'
+                                              for line in termlines))
+        # Displayed lines from the bottom of the window, with their number of
+        # window lines, counted without splitting the lines
+        displayed: List[Tuple[TermLine, Optional[int]]] = []
         if termlines is not None:
             for termline in reversed(termlines):
-                screenlines = termline.get(maximum=quota)
-                quota -= len(screenlines)
-                content.append((termline, screenlines))
+                count = min(termline.line_count, quota)
+                quota -= count
+                displayed.append((termline, count))
                 if not quota:
                     self.logger.info('Window full, clearing')
                     self.clear()
                     break
         if self._title is not None:
-            content += [(self._title, self._title.get())]
-        self.queue.put((content, position))
+            displayed.append((self._title, None))
+        # Lay the screen lines out as (posy, attr, line) rows, from the top
+        rows: List[ScreenRow] = []
+        posy = 0
+        for termline, count in reversed(displayed):
+            attr = termline.attr
+            for line in termline.get(maximum=count):
+                rows.append((posy, attr, line))
+                posy += 1
+        curx = displayed[0][0].screen_pos[1] if displayed else 0
+        with self._pending_lock:
+            self._pending = (rows, (posy - 1, curx))
 
 
 # pylint: disable=too-many-instance-attributes
@@ -365,6 +551,8 @@ class Interface:
         self.logger = logging.getLogger(self.__class__.__name__)
         self.screen: Optional['curses._CursesWindow'] = curses.initscr()
         self.windows: Dict[str, TermWindow] = {}
+        # Set by any thread to request a redraw, done by the interface thread
+        self._redraw = threading.Event()
         self.logger.info('Curses version: %d.%d.%d', *curses.ncurses_version)
         self.logger.debug('TERM: %s', os.environ['TERM'])
 
@@ -385,6 +573,7 @@ class Interface:
         '''Clear all the windows in the interface'''
         for window in self.windows.values():
             window.clear()
+        self._redraw.set()
 
     def getmaxyx(self) -> Tuple[int, int]:
         '''Get the interface maximum dimensions'''
@@ -393,9 +582,29 @@ class Interface:
         return self.screen.getmaxyx()
 
     def redraw(self) -> None:
-        '''Redraw all the windows in the interface'''
+        '''Redraw all the windows in the interface, only the windows written
+        since the last redraw being refreshed
+        '''
+        self._redraw.clear()
+        cursor_moved = False
         for window in self.windows.values():
-            window.redraw()
+            if window.redraw():
+                cursor_moved = not window.cursor
+        if cursor_moved:
+            # The terminal cursor follows the last refreshed window
+            for window in self.windows.values():
+                if window.cursor:
+                    window.cursor_place()
+
+    def redraw_requested(self) -> bool:
+        '''Indicates if a redraw was requested since the last one'''
+        return self._redraw.is_set()
+
+    def request_redraw(self) -> None:
+        '''Request a redraw of the interface. Contrary to "redraw", this can be
+        called from any thread, the interface thread doing the redraw
+        '''
+        self._redraw.set()
 
     def terminate(self) -> None:
         '''Terminates the interface, resetting the user terminal to its usual
@@ -435,4 +644,5 @@ class Interface:
             self.logger.warning('Window %s does not exist', window_name)
             return False
         window.write(lines)
+        self._redraw.set()
         return True
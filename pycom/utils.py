@@ -1,14 +1,22 @@
 '''Collection of '''
 
-import collections
 import curses.ascii
 import json
 import logging
 import operator
 import os
-import select
+import re
+import stat
 import sys
-from typing import TYPE_CHECKING, Any, List, Optional, Sequence, Union
+from typing import (
+    TYPE_CHECKING, Any, Callable, List, Mapping, Optional, Sequence, TypeVar,
+    Union
+)
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover (optional dependency)
+    orjson = None
 
 __author__ = 'Jimmy Durand Wesolowski'
 __copyright__ = 'Copyright (C) 2022 Jimmy Durand Wesolowski'
@@ -22,6 +30,7 @@ if TYPE_CHECKING:
 
 FileType = Union[Union[str, bytes, os.PathLike], int]
 OptionalFileOrFilename = Optional[Union[str, 'SupportsRead[str]']]
+SequenceType = TypeVar('SequenceType', bound=Sequence)
 
 ASCII_MAP = {
     curses.ascii.NUL: "NUL - NUL",
@@ -68,35 +77,60 @@ ASCII_MAP = {
     curses.KEY_END: 'KEY_END',
     curses.KEY_BACKSPACE: 'KEY_BACKSPACE',
 }
+# ASCII_MAP split into a table indexed by the ASCII codes and the other keys
+_ASCII_TABLE = tuple(ASCII_MAP.get(key) for key in range(128))
+_KEY_MAP = {key: name for key, name in ASCII_MAP.items() if key >= 128}
 
 
-def chunks(lst: Sequence,
-           num: int) -> collections.abc.Iterator:
-    '''Yield successive num-sized chunks from lst.
-    source: https://stackoverflow.com/a/312464
+if orjson is not None:
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+else:  # pragma: no cover (optional dependency)
+    def json_dumps(obj: Any) -> bytes:
+        '''Serialize "obj" to JSON bytes, like orjson.dumps'''
+        return json.dumps(obj).encode('utf-8')
+
+    json_loads = json.loads
+
+
+def key_describe(key: int) -> Optional[str]:
+    '''Returns the ASCII_MAP description of the key code "key", or None if it
+    has none
     '''
-    for i in range(0, len(lst), num):
-        yield lst[i:i + num]
+    if 0 <= key < 128:
+        return _ASCII_TABLE[key]
+    return _KEY_MAP.get(key)
 
 
-def _dict_update_rec(dict1: dict, dict2: dict) -> Any:
-    '''Recursively add or update dict1 with dict2'''
-    try:
-        for key, value in dict2.items():
-            if key in dict1:
-                dict1[key] = _dict_update_rec(dict1[key], value)
-                continue
-            dict1[key] = value
-        return dict1
-    except (AttributeError, ValueError):
-        return dict2
+def chunks(lst: SequenceType, num: int) -> List[SequenceType]:
+    '''Returns the successive num-sized chunks of lst.
+    source: https://stackoverflow.com/a/312464
+    '''
+    if len(lst) <= num:
+        # Most lines fit in a single chunk
+        return [lst] if lst else []
+    return [lst[i:i + num] for i in range(0, len(lst), num)]
 
 
 def dict_update_deep(dict1: dict, dict2: dict) -> dict:
     '''Update in place a dictionary 'dict1' key values for keys that exist or
     add the missing ones. Returns the updated 'dict1'.
     '''
-    return _dict_update_rec(dict1, dict2)
+    # Iterate over the nested dictionaries to update, instead of recursing
+    stack = [(dict1, dict2)]
+    while stack:
+        current, update = stack.pop()
+        if current.keys().isdisjoint(update):
+            # No nested dictionary to merge, all the values are assigned
+            current.update(update)
+            continue
+        for key, value in update.items():
+            previous = current.get(key)
+            if isinstance(previous, dict) and isinstance(value, dict):
+                stack.append((previous, value))
+            else:
+                current[key] = value
+    return dict1
 
 
 def logging_level(verbose_count: Optional[int] = None):
@@ -112,18 +146,21 @@ def logging_level(verbose_count: Optional[int] = None):
         logger.setLevel(logging.DEBUG)
 
 
-def project_load_json(filename: str, toolname: Optional[str] = None,
-                      default: Any = None):
+def project_load_json(filename: Union[str, 'SupportsRead[Union[str, bytes]]'],
+                      toolname: Optional[str] = None, default: Any = None):
     '''Load a project JSON file from .config/<toolname> (relative path) or the
-    given absolute path and returns it as a dictionary.
+    given absolute path and returns it as a dictionary. "filename" can also
+    be an already opened file, read as is
     '''
+    if not isinstance(filename, str):
+        return json_loads(filename.read())
     if os.path.isabs(filename) or toolname is None:
         path = filename
     else:
         path = os.path.join(os.environ['HOME'], '.config', toolname, filename)
     try:
-        with open(path, encoding='utf-8') as file_fd:
-            return json.load(file_fd)
+        with open(path, 'rb') as file_fd:
+            return json_loads(file_fd.read())
     except (FileNotFoundError, OSError):
         return default
 
@@ -132,8 +169,9 @@ def stdin_readlines() -> Union[List[str], None]:
     '''Detects content on stdin, reads its lines and duplicates it'''
     # Based on https://stackoverflow.com/a/17735803
     # if sys.stdin.isatty()):
-    # Based on https://stackoverflow.com/a/3763257
-    if not select.select([sys.stdin, ], [], [], 0.0)[0]:
+    # Only a piped or redirected stdin holds content
+    mode = os.fstat(sys.stdin.fileno()).st_mode
+    if not stat.S_ISFIFO(mode) and not stat.S_ISREG(mode):
         return None
     input_content = sys.stdin.readlines()
     # Duplicate stdin to be able to read stdin again
@@ -153,43 +191,76 @@ MATH_OPERATORS = {
     '/': operator.truediv,
     '//': operator.floordiv,
 }
-MATH_OPERATOR_PIORITY = ['*', '/', '//', '+', '-']
+# Operators priority, the highest being applied first
+MATH_OPERATOR_PRIORITY = {'*': 2, '/': 2, '//': 2, '+': 1, '-': 1}
+# Split an expression into its operands and operators, the longest operators
+# being tried first
+_MATH_OPERATOR_RE = re.compile('({})'.format('|'.join(
+    map(re.escape, sorted(MATH_OPERATORS, key=len, reverse=True)))))
 
 
-def _parse_math_simple(expr, operators):
+def _compile_math_operand(operand: str) -> Optional[Callable]:
+    operand = operand.strip()
+    if (operand[:1] == '{' and operand[-1:] == '}'
+            and operand[1:-1].isidentifier()):
+        return operator.itemgetter(operand[1:-1])
     try:
-        val = int(expr)
-        return val
+        value = int(operand)
     except ValueError:
-        pass
-    try:
-        curop = operators[-1]
-        func = MATH_OPERATORS[curop]
-    except (KeyError, IndexError):
         return None
-    elts = expr.split(curop)
-    if len(elts) == 1:
-        return _parse_math_simple(expr, operators[:-1])
-    elts = [_parse_math_simple(elt, operators[:-1]) for elt in elts]
-    return [func, elts]
+    return lambda variables: value
+
+
+def _compile_math_apply(func: Callable, first: Callable,
+                        second: Callable) -> Callable:
+    def evaluate(variables: Mapping[str, Any]) -> Any:
+        return func(first(variables), second(variables))
+    return evaluate
+
+
+def _math_reduce(values: List[Callable], operators: List[str]) -> None:
+    '''Replace the last two values by the last operator applied to them'''
+    second = values.pop()
+    values.append(_compile_math_apply(MATH_OPERATORS[operators.pop()],
+                                      values.pop(), second))
 
 
-def _eval_math_simple(content):
-    val = 0
+def compile_math_simple(expr) -> Callable[[Mapping[str, Any]], Any]:
+    '''Parse once the given math expression, which can contain "{name}"
+    variables, and return a function evaluating it from a mapping of the
+    variable values, without using external library. The expression is
+    parsed in a single pass (shunting-yard), the operators being applied from
+    left to right according to their priority. The function returns None if
+    the expression is not supported
+    '''
     try:
-        func, elts = content
-    except TypeError:
-        return content
-    vals = [_eval_math_simple(elt) for elt in elts]
-    ret = vals[0]
-    for val in vals[1:]:
-        ret = func(ret, val)
-    return ret
+        value = int(expr)
+    except ValueError:
+        pass
+    else:
+        return lambda variables: value
+    tokens = _MATH_OPERATOR_RE.split(expr)
+    values: List[Callable] = []
+    operators: List[str] = []
+    for idx, token in enumerate(tokens):
+        if idx % 2:
+            priority = MATH_OPERATOR_PRIORITY[token]
+            while (operators
+                   and MATH_OPERATOR_PRIORITY[operators[-1]] >= priority):
+                _math_reduce(values, operators)
+            operators.append(token)
+            continue
+        operand = _compile_math_operand(token)
+        if operand is None:
+            return lambda variables: None
+        values.append(operand)
+    while operators:
+        _math_reduce(values, operators)
+    return values[0]
 
 
 def eval_math_simple(expr):
     '''Safely evaluate the given math expression without using external
     library
     '''
-    parsed = _parse_math_simple(expr, MATH_OPERATOR_PIORITY)
-    return _eval_math_simple(parsed)
+    return compile_math_simple(expr)({})
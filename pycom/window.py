@@ -58,3 +58,10 @@ class Window:  # pragma: no cover (interface)
     def refresh(self) -> None:
         '''Refresh the window'''
         raise NotImplementedError
+
+    @abstractmethod
+    def timeout(self, delay: int) -> None:
+        '''Set the "getch" blocking delay in milliseconds, negative for no
+        delay limit
+        '''
+        raise NotImplementedError
@@ -14,6 +14,9 @@ setup(name='pycom',
       install_requires=[
           "pyserial >= 3.5",
       ],
+      extras_require={
+          'fast': ['orjson'],
+      },
       package_data={
           'pycom': ['conf/example.json']
       }
@@ -5,16 +5,29 @@ import unittest.mock
 
 from tests.common import TestCommon
 import pycom.command
+import pycom.terminal
 from pycom.mode import Mode
 from pycom.cursorpos import CursorPos
 # import pycom.utils
 
 
 class TestCommand(TestCommon):
+    # Terminal interface attributes, including the annotated ones, the only
+    # ones the command can use
+    TERMINAL_SPEC = sorted(set(dir(pycom.terminal.Terminal))
+                           | set(pycom.terminal.Terminal.__annotations__))
+
     def setUp(self):
-        self.terminal = unittest.mock.MagicMock()
+        self.terminal = unittest.mock.MagicMock(spec_set=self.TERMINAL_SPEC)
         self.command = pycom.command.Command(self.terminal)
 
+    def assert_called_once_reset(self, mock, *args, **kwargs):
+        '''Check "mock" was called once with the given arguments, and reset it
+        only, rather than the whole terminal mock tree
+        '''
+        mock.assert_called_once_with(*args, **kwargs)
+        mock.reset_mock()
+
     def test_start_stop(self):
         self.command.start()
         self.terminal.assert_not_called()
@@ -22,28 +35,15 @@ class TestCommand(TestCommon):
         self.terminal.assert_not_called()
 
     def test_backspace(self):
-        self.command(curses.KEY_BACKSPACE)
-        self.terminal.line_current.delete.assert_called_once_with(1)
-        self.terminal.line_current.delete.reset_mock()
-
-        self.terminal.mode_set(Mode.COMPLETION)
-        self.command(curses.KEY_BACKSPACE)
-        self.terminal.line_current.delete.assert_called_once_with(1)
-        self.terminal.line_current.delete.reset_mock()
-
-        self.terminal.mode_set(Mode.ESCAPE)
-        self.command(curses.KEY_BACKSPACE)
-        self.terminal.line_current.delete.assert_called_with(1)
-        self.terminal.line_current.delete.reset_mock()
-
-        self.terminal.mode_set(Mode.HISTORY)
-        self.command(curses.KEY_BACKSPACE)
-        self.terminal.line_current.delete.assert_called_with(1)
-        self.terminal.line_current.delete.reset_mock()
-
-        self.terminal.mode_set(Mode.SEARCH)
-        self.command(curses.KEY_BACKSPACE)
-        self.terminal.line_current.delete.assert_called_with(1)
+        delete = self.terminal.line_current.delete
+        for mode in [None, Mode.COMPLETION, Mode.ESCAPE, Mode.HISTORY,
+                     Mode.SEARCH]:
+            with self.subTest(mode=mode):
+                if mode is not None:
+                    self.terminal.mode_set(mode)
+                self.command(curses.KEY_BACKSPACE)
+                delete.assert_called_once_with(1)
+                delete.reset_mock()
 
     def test_eot(self):
         self.command(curses.ascii.EOT)
@@ -51,8 +51,7 @@ class TestCommand(TestCommon):
 
     def test_history_browse(self):
         self.command(curses.KEY_UP)
-        self.terminal.mode_set.assert_called_once_with(Mode.HISTORY)
-        self.terminal.mode_set.reset_mock()
+        self.assert_called_once_reset(self.terminal.mode_set, Mode.HISTORY)
 
         self.command(curses.KEY_DOWN)
         self.terminal.mode_set.assert_not_called()
@@ -61,54 +60,40 @@ class TestCommand(TestCommon):
         ret = command(curses.KEY_DOWN)
         self.assertTrue(ret)
         self.terminal.mode_set.assert_not_called()
-        self.terminal.history.pos_update.assert_called_once_with(1)
-        self.terminal.history.reset_mock()
+        self.assert_called_once_reset(self.terminal.history.pos_update, 1)
 
         ret = command(curses.KEY_UP)
         self.assertTrue(ret)
         self.terminal.mode_set.assert_not_called()
-        self.terminal.history.pos_update.assert_called_once_with(-1)
-        self.terminal.history.reset_mock()
+        self.assert_called_once_reset(self.terminal.history.pos_update, -1)
 
     def test_history_modify(self):
         command = pycom.command.CommandHistory(self.terminal)
 
         ret = command(ord('a'))
         self.assertTrue(ret)
-        self.terminal.mode_set.assert_called_once_with(Mode.NORMAL)
-        self.terminal.overwrite.assert_called_once_with(
-            f'{self.terminal.history[0]}a')
-        self.terminal.mode_set.reset_mock()
-        self.terminal.history.reset_mock()
-        self.terminal.overwrite.reset_mock()
+        self.assert_called_once_reset(self.terminal.mode_set, Mode.NORMAL)
+        self.assert_called_once_reset(self.terminal.overwrite,
+                                      f'{self.terminal.history[0]}a')
 
         ret = command(ord('\n'))
         self.assertTrue(ret)
-        self.terminal.mode_set.assert_called_once_with(Mode.NORMAL)
-        self.terminal.overwrite.assert_called_once_with(
-            str(self.terminal.history.line_current))
-        self.terminal.mode_set.reset_mock()
-        self.terminal.history.reset_mock()
-        self.terminal.overwrite.reset_mock()
+        self.assert_called_once_reset(self.terminal.mode_set, Mode.NORMAL)
+        self.assert_called_once_reset(
+            self.terminal.overwrite, str(self.terminal.history.line_current))
 
         ret = command(curses.KEY_BACKSPACE)
         self.assertTrue(ret)
-        self.terminal.mode_set.assert_called_once_with(Mode.NORMAL)
-        self.terminal.overwrite.assert_called_once_with(
-            str(self.terminal.history.line_current))
+        self.assert_called_once_reset(self.terminal.mode_set, Mode.NORMAL)
+        self.assert_called_once_reset(
+            self.terminal.overwrite, str(self.terminal.history.line_current))
         self.terminal.history.line_current.delete.assert_not_called()
         self.terminal.line_current.delete.assert_called_once_with(1)
-        self.terminal.mode_set.reset_mock()
-        self.terminal.history.reset_mock()
-        self.terminal.overwrite.reset_mock()
 
     def test_history_unimplemented(self):
         command = pycom.command.CommandHistory(self.terminal)
         ret = command(0x80)
         self.assertFalse(ret)
-        self.terminal.mode_set.reset_mock()
-        self.terminal.history.reset_mock()
-        self.terminal.overwrite.reset_mock()
 
     def test_history_entries(self):
         command = pycom.command.CommandHistory(self.terminal)
@@ -126,8 +111,7 @@ class TestCommand(TestCommon):
 
         ret = command(curses.KEY_UP)
         self.assertTrue(ret)
-        self.terminal.mode_set.assert_called_once_with(Mode.NORMAL)
-        self.terminal.mode_set.reset_mock()
+        self.assert_called_once_reset(self.terminal.mode_set, Mode.NORMAL)
 
         ret = command(curses.KEY_DOWN)
         self.assertTrue(ret)
@@ -139,64 +123,52 @@ class TestCommand(TestCommon):
         self.terminal.history.reset.assert_called_once_with()
 
     def test_line_append(self):
-        self.terminal.line_current.__iadd__.return_value = self.terminal.line_current
+        write = self.terminal.line_current.write
         self.command(ord('a'))
-        self.terminal.line_current.__iadd__.assert_called_once_with('a')
-        self.terminal.line_current.__iadd__.reset_mock()
+        self.assert_called_once_reset(write, 'a')
 
         self.command(ord(' '))
-        self.terminal.line_current.__iadd__.assert_called_once_with(' ')
-        self.terminal.line_current.__iadd__.reset_mock()
+        self.assert_called_once_reset(write, ' ')
 
         self.command(ord('\n'))
-        self.terminal.line_current.__iadd__.assert_not_called()
-        self.terminal.line_current.__iadd__.reset_mock()
+        write.assert_not_called()
 
         self.command(curses.KEY_RIGHT)
-        self.terminal.line_current.__iadd__.assert_not_called()
+        write.assert_not_called()
 
     def test_line_pos(self):
-        self.command(curses.KEY_LEFT)
-        self.terminal.pos_update.assert_called_once_with(CursorPos.LEFT)
-
-        self.command(curses.KEY_RIGHT)
-        self.terminal.pos_update.assert_called_with(CursorPos.RIGHT)
-
-        self.command(curses.KEY_HOME)
-        self.terminal.pos_update.assert_called_with(CursorPos.HOME)
-
-        self.command(curses.KEY_END)
-        self.terminal.pos_update.assert_called_with(CursorPos.END)
+        pos_update = self.terminal.pos_update
+        for key, pos in {curses.KEY_LEFT: CursorPos.LEFT,
+                         curses.KEY_RIGHT: CursorPos.RIGHT,
+                         curses.KEY_HOME: CursorPos.HOME,
+                         curses.KEY_END: CursorPos.END}.items():
+            with self.subTest(key=key):
+                self.command(key)
+                pos_update.assert_called_once_with(pos)
+                pos_update.reset_mock()
 
     def test_newline(self):
-        self.command(curses.ascii.NL)
-        self.terminal.newline.assert_called_once()
-        self.terminal.newline.reset_mock()
-
-        self.command(ord('\n'))
-        self.terminal.newline.assert_called_once()
-        self.terminal.newline.reset_mock()
-
-        self.command(ord('\r'))
-        self.terminal.newline.assert_called_once()
-        self.terminal.newline.reset_mock()
+        newline = self.terminal.newline
+        for key in [curses.ascii.NL, ord('\n'), ord('\r')]:
+            with self.subTest(key=key):
+                self.command(key)
+                newline.assert_called_once()
+                newline.reset_mock()
 
     def test_partially_implemented(self):
         def partial_implementation(key):
             return False
         self.command.logger = unittest.mock.Mock()
-        with unittest.mock.patch.dict(self.command._map,
-                                      {256: partial_implementation}):
-            self.command(256)
-            self.terminal.interface.write.assert_called_once_with('error',
-                'Line functionality 256 not fully implemented yet')
-            self.command.logger.warning.assert_called_once_with(
-                'Command %s not fully implemented', 256)
+        self.command._dispatch[256] = partial_implementation
+        self.command(256)
+        self.terminal.interface.write.assert_called_once_with('error',
+            'Line functionality 256 not fully implemented yet')
+        self.command.logger.warning.assert_called_once_with(
+            'Command %s not fully implemented', 256)
 
+    # FIXME: Not implemented yet
+    @unittest.skip('Search not implemented yet')
     def test_search(self):
-        # FIXME: Not implemented yet
-        print('Search not implemented yet')
-        return
         self.command(curses.ascii.DC2)
         self.terminal.mode_set.assert_called_once_with(Mode.SEARCH)
         self.assertTrue(self.command.is_command(ord('s')))
@@ -209,10 +181,9 @@ class TestCommand(TestCommon):
         self.terminal.newline.assert_called_once()
         self.assertFalse(self.command.is_command(ord('s')))
 
+    # FIXME: Not implemented yet
+    @unittest.skip('Completion not implemented yet')
     def test_tab(self):
-        # FIXME: Not implemented yet
-        print('Completion not implemented yet')
-        return
         self.command(curses.ascii.TAB)
         self.terminal.completion.assert_called_once()
 
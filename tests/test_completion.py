@@ -0,0 +1,51 @@
+from tests.common import TestCommon
+from pycom.completion import Completion
+
+
+class TestCompletion(TestCommon):
+    DICTIONARY = {
+        'command_1': ['command_1_argument2', 'command_1_argument1'],
+        'command_2': {
+            'command_2_subcommand_2': [],
+            'command_2_subcommand_1': ['command_2_subcommand_1_arg1'],
+        },
+        'other': [],
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.completion = Completion(self.DICTIONARY)
+
+    def test_entries(self):
+        self.assertEqual(set(self.completion.entries([])),
+                         {'command_1', 'command_2', 'other'})
+        self.assertEqual(
+            self.completion.entries(['command_2', 'command_2_subcommand_1']),
+            ['command_2_subcommand_1_arg1'])
+        self.assertEqual(set(self.completion.entries(['unknown'])),
+                         {'command_1', 'command_2', 'other'})
+
+    def test_search_empty(self):
+        self.assertEqual(self.completion.search(''),
+                         ('', ['command_1', 'command_2', 'other']))
+
+    def test_search_word(self):
+        self.assertEqual(self.completion.search('com'),
+                         ('', ['command_1', 'command_2']))
+        self.assertEqual(self.completion.search('command_1'),
+                         ('', ['command_1']))
+        self.assertEqual(self.completion.search('o'), ('', ['other']))
+        self.assertEqual(self.completion.search('x'), ('', []))
+
+    def test_search_line(self):
+        self.assertEqual(
+            self.completion.search('command_2 '),
+            ('command_2 ',
+             ['command_2_subcommand_1', 'command_2_subcommand_2']))
+        self.assertEqual(
+            self.completion.search('command_1 command_1_argument'),
+            ('command_1 ', ['command_1_argument1', 'command_1_argument2']))
+        self.assertEqual(
+            self.completion.search('command_2 command_2_subcommand_1 '),
+            ('command_2 command_2_subcommand_1 ',
+             ['command_2_subcommand_1_arg1']))
@@ -1,5 +1,6 @@
 from copy import deepcopy
 import datetime
+import io
 import json
 import logging
 import logging.config
@@ -14,15 +15,37 @@ from pycom.utils import eval_math_simple, project_load_json
 
 
 class TestConfig(TestCommon):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Single default configuration file, rewritten by the tests needing it
+        cls.def_config = tempfile.NamedTemporaryFile(buffering=0)
+        cls.default_config = Config.DEFAULT_CONFIG
+        Config.DEFAULT_CONFIG = cls.def_config.name
+        # Config.DEFAULT must not be modified by any test
+        cls.default = deepcopy(Config.DEFAULT)
+
+    @classmethod
+    def tearDownClass(cls):
+        Config.DEFAULT_CONFIG = cls.default_config
+        cls.def_config.close()
+        super().tearDownClass()
+
     def _conf_file(self, **kwargs):
-        self.def_config = tempfile.NamedTemporaryFile(mode='a+t')
-        json.dump(kwargs, self.def_config)
+        return io.StringIO(json.dumps(kwargs))
+
+    def _conf_file_default(self, **kwargs):
+        # Unbuffered: the content is written at once, without flushing
         self.def_config.seek(0)
-        Config.DEFAULT_CONFIG = self.def_config.name
+        self.def_config.truncate()
+        self.def_config.write(json.dumps(kwargs).encode())
+
+    def _serial_config(self, **kwargs):
+        return Config.SerialConfig(**{**Config.DEFAULT['serial'], **kwargs})
 
     def setUp(self):
         super().setUp()
-        self.default = deepcopy(Config.DEFAULT)
+        self._conf_file_default()
 
     def tearDown(self):
         self.assertEqual(Config.DEFAULT, self.default)
@@ -32,12 +55,11 @@ class TestConfig(TestCommon):
         'logging.config.dictConfig',
         unittest.mock.Mock(side_effect=logging.config.dictConfig))
     def test_default(self):
-        self._conf_file()
+        self._conf_file_default()
         config = Config()
         self.assertEqual(config.colors, Config.DEFAULT['colors'])
         self.assertEqual(config.logging, Config.DEFAULT['logging'])
-        self.assertEqual(config.serial, Config.SerialConfig(
-            **Config.DEFAULT['serial']))
+        self.assertEqual(config.serial, self._serial_config())
         logging.config.dictConfig.assert_called_once_with(config.logging)
 
     def test_no_config(self):
@@ -45,101 +67,71 @@ class TestConfig(TestCommon):
         config = Config()
         self.assertEqual(config.colors, Config.DEFAULT['colors'])
         self.assertEqual(config.logging, Config.DEFAULT['logging'])
-        self.assertEqual(config.serial, Config.SerialConfig(
-            **Config.DEFAULT['serial']))
+        self.assertEqual(config.serial, self._serial_config())
 
     def test_config_bad_type(self):
         with self.assertRaises(TypeError):
             config = Config(1)
 
     def test_config_file(self):
-        def_config = tempfile.NamedTemporaryFile(mode='a+t')
-        json.dump({'history_save': False, 'colors': False}, def_config)
-        def_config.seek(0)
-        config = Config(def_config)
+        config = Config(self._conf_file(history_save=False, colors=False))
         self.assertFalse(config.colors)
         self.assertFalse(config.history_save)
         self.assertEqual(config.logging, Config.DEFAULT['logging'])
-        self.assertEqual(config.serial, Config.SerialConfig(
-            **Config.DEFAULT['serial']))
+        self.assertEqual(config.serial, self._serial_config())
 
     def test_config_filename(self):
-        def_config = tempfile.NamedTemporaryFile(mode='a+t')
-        json.dump({'history_save': False, 'colors': False}, def_config)
-        def_config.seek(0)
-        config = Config(def_config.name)
+        self._conf_file_default(history_save=False, colors=False)
+        config = Config(self.def_config.name)
         self.assertFalse(config.colors)
         self.assertFalse(config.history_save)
-        self.assertEqual(config.serial, Config.SerialConfig(
-            **Config.DEFAULT['serial']))
+        self.assertEqual(config.serial, self._serial_config())
 
     def test_overwrite_conf_file(self):
-        self._conf_file(history_save=False, colors=False)
+        self._conf_file_default(history_save=False, colors=False)
         config = Config()
         self.assertFalse(config.colors)
         self.assertFalse(config.history_save)
         self.assertEqual(config.logging, Config.DEFAULT['logging'])
-        self.assertEqual(config.serial, Config.SerialConfig(
-            **Config.DEFAULT['serial']))
+        self.assertEqual(config.serial, self._serial_config())
 
     def test_overwrite_args(self):
-        self._conf_file()
-        config = Config(port='/dev/ttyS0', history_save=False)
+        config = Config(self._conf_file(), port='/dev/ttyS0',
+                        history_save=False)
         self.assertEqual(config.colors, Config.DEFAULT['colors'])
         self.assertFalse(config.history_save)
         self.assertEqual(config.logging, Config.DEFAULT['logging'])
-        self.assertEqual(config.serial.baudrate,
-                         Config.DEFAULT['serial']['baudrate'])
-        self.assertEqual(config.serial.bytesize,
-                         Config.DEFAULT['serial']['bytesize'])
-        self.assertEqual(config.serial.parity,
-                         Config.DEFAULT['serial']['parity'])
-        self.assertEqual(config.serial.stopbits,
-                         Config.DEFAULT['serial']['stopbits'])
-        self.assertEqual(config.serial.port, '/dev/ttyS0')
+        self.assertEqual(config.serial, self._serial_config(port='/dev/ttyS0'))
 
     def test_overwrite_config_args(self):
-        self._conf_file(colors=False)
-        config = Config(port='/dev/ttyS0', history_save=False)
+        config = Config(self._conf_file(colors=False), port='/dev/ttyS0',
+                        history_save=False)
         self.assertFalse(config.colors)
         self.assertFalse(config.history_save)
         self.assertEqual(config.logging, Config.DEFAULT['logging'])
-        self.assertEqual(config.serial.baudrate,
-                         Config.DEFAULT['serial']['baudrate'])
-        self.assertEqual(config.serial.bytesize,
-                         Config.DEFAULT['serial']['bytesize'])
-        self.assertEqual(config.serial.parity,
-                         Config.DEFAULT['serial']['parity'])
-        self.assertEqual(config.serial.stopbits,
-                         Config.DEFAULT['serial']['stopbits'])
-        self.assertEqual(config.serial.port, '/dev/ttyS0')
+        self.assertEqual(config.serial, self._serial_config(port='/dev/ttyS0'))
 
     def test_serial_baudrate(self):
-        self._conf_file(baudrate=5000, ratelimit=1000)
-        config = Config()
+        config = Config(self._conf_file(baudrate=5000, ratelimit=1000))
         self.assertEqual(config.serial.baudrate, 5000)
         self.assertEqual(config.serial.ratelimit,
                          datetime.timedelta(microseconds=1000))
 
     def test_serial_ratelimit(self):
-        self._conf_file(ratelimit=1)
-        config = Config()
+        config = Config(self._conf_file(ratelimit=1))
         self.assertEqual(config.serial.ratelimit,
                          datetime.timedelta(seconds=1))
 
-        self._conf_file(ratelimit=1000)
-        config = Config()
+        config = Config(self._conf_file(ratelimit=1000))
         self.assertEqual(config.serial.ratelimit,
                          datetime.timedelta(milliseconds=1))
 
-        self._conf_file(ratelimit=1000000, baudrate=1000000)
-        config = Config()
+        config = Config(self._conf_file(ratelimit=1000000, baudrate=1000000))
         self.assertEqual(config.serial.ratelimit,
                          datetime.timedelta(microseconds=1))
 
     def test_serial_baudrate_ratelimit(self):
-        self._conf_file(baudrate=500, ratelimit=1000)
-        config = Config()
+        config = Config(self._conf_file(baudrate=500, ratelimit=1000))
         self.assertEqual(config.serial.baudrate, 500)
         self.assertEqual(config.serial.ratelimit, None)
 
@@ -151,23 +143,16 @@ class TestConfig(TestCommon):
                 }
             }
         }
-        self._conf_file(history_save=False, logging=log_conf_up)
-        config = Config(port='/dev/ttyS0', history_save=False)
+        config = Config(
+            self._conf_file(history_save=False, logging=log_conf_up),
+            port='/dev/ttyS0', history_save=False)
         self.assertEqual(config.colors, Config.DEFAULT['colors'])
         self.assertFalse(config.history_save)
         self.assertEqual(config.logging['formatters']['simple'],
                          log_conf_up['formatters']['simple'])
         self.assertEqual(config.logging['formatters']['full'],
                          Config.DEFAULT['logging']['formatters']['full'])
-        self.assertEqual(config.serial.baudrate,
-                         Config.DEFAULT['serial']['baudrate'])
-        self.assertEqual(config.serial.bytesize,
-                         Config.DEFAULT['serial']['bytesize'])
-        self.assertEqual(config.serial.parity,
-                         Config.DEFAULT['serial']['parity'])
-        self.assertEqual(config.serial.stopbits,
-                         Config.DEFAULT['serial']['stopbits'])
-        self.assertEqual(config.serial.port, '/dev/ttyS0')
+        self.assertEqual(config.serial, self._serial_config(port='/dev/ttyS0'))
 
     def test_bad_logconfig_assert(self):
         log_conf_up = {
@@ -235,7 +220,9 @@ class TestConfig(TestCommon):
                 'title': 'Commands'
             }
         ]
-        self._conf_file(**data)
-        config = Config()
+        config = Config(self._conf_file(**data))
         config.interface_parse(cols=40, lines=30)
         self.assertEqual(config.interface, interface_parsed)
+        config.interface_parse(cols=60, lines=30)
+        self.assertEqual(config.interface[1]['cols'], 30)
+        self.assertEqual(config.interface[1]['posx'], 30)
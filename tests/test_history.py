@@ -1,4 +1,5 @@
 import os
+from pathlib import Path
 import tempfile
 import unittest
 import unittest.mock
@@ -10,9 +11,26 @@ from pycom.history import History
 
 
 class TestHistory(TestCommon):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tmpdir = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+        super().tearDownClass()
+
     def setUp(self):
         super().setUp()
         self.history = History()
+        # Test own directory, used as home, in the class temporary directory
+        self.home = os.path.join(self.tmpdir.name, self._testMethodName)
+        os.mkdir(self.home)
+        self.history_path = os.path.join(self.home, 'history')
+
+    def _history_write(self, data):
+        Path(self.history_path).write_text(os.linesep.join(data))
 
     def test_init_no_load(self):
         self.assertEqual(self.history.pos, -1)
@@ -23,25 +41,23 @@ class TestHistory(TestCommon):
         self.assertEqual(list(self.history), ['test'])
 
     def test_init_no_config(self):
-        temp_name = next(tempfile._get_candidate_names())
         with self.assertRaises(History.Error):
-            self.history.load(True, temp_name)
+            self.history.load(True, self.history_path)
         self.assertEqual(self.history.pos, -1)
         self.assertEqual(list(self.history), [])
         self.assertEqual(self.history.line_current, None)
 
     def test_init_empty_config(self):
-        with tempfile.NamedTemporaryFile() as temp_name:
-            self.history.load(True, temp_name.name)
+        self._history_write([])
+        self.history.load(True, self.history_path)
         self.assertEqual(self.history.pos, -1)
         self.assertEqual(list(self.history), [])
 
     def test_init_default_config(self):
-        with tempfile.TemporaryDirectory() as tmp:
-            with unittest.mock.patch.dict(os.environ, {'HOME':  tmp}):
-                with self.assertRaises(History.Error):
-                    self.history.load()
-                self.history.load(False)
+        with unittest.mock.patch.dict(os.environ, {'HOME': self.home}):
+            with self.assertRaises(History.Error):
+                self.history.load()
+            self.history.load(False)
 
     def test_append_empty_line(self):
         self.assertEqual(self.history.pos, -1)
@@ -51,75 +67,70 @@ class TestHistory(TestCommon):
         self.assertEqual(len(self.history), 0)
         self.assertEqual(list(self.history), [])
 
+    # Appended entry, expected history and position
+    APPEND_STEPS = (
+        ('test1', ['test1'], 0),
+        ('test1', ['test1'], 0),
+        ('test2', ['test1', 'test2'], 1),
+        ('test1', ['test2', 'test1'], 1),
+        ('test1', ['test2', 'test1'], 1),
+        ('test2', ['test1', 'test2'], 1),
+        ('test3', ['test1', 'test2', 'test3'], 2),
+        ('test1', ['test2', 'test3', 'test1'], 2),
+    )
+
     def test_append_twice(self):
         self.assertEqual(self.history.pos, -1)
-        self.assertEqual(list(self.history), [])
-        self.history.append('test1')
-        self.assertEqual(list(self.history), ['test1'])
-        self.assertEqual(self.history.pos, 0)
-        self.assertEqual(len(self.history), 1)
-        self.assertEqual(self.history.line_current, 'test1')
-        self.history.append('test1')
-        self.assertEqual(len(self.history), 1)
-        self.assertEqual(list(self.history), ['test1'])
-        self.assertEqual(self.history.pos, 0)
-        self.assertEqual(self.history.line_current, 'test1')
-        self.history.append('test2')
-        self.assertEqual(self.history.pos, 1)
-        self.assertEqual(len(self.history), 2)
-        self.assertEqual(list(self.history), ['test1', 'test2'])
-        self.assertEqual(self.history.line_current, 'test2')
-        self.history.append('test1')
-        self.assertEqual(len(self.history), 2)
-        self.assertEqual(list(self.history), ['test2', 'test1'])
-        self.assertEqual(self.history.pos, 1)
-        self.assertEqual(self.history.line_current, 'test1')
-        self.history.append('test1')
-        self.assertEqual(self.history.pos, 1)
-        self.assertEqual(len(self.history), 2)
-        self.assertEqual(list(self.history), ['test2', 'test1'])
-        self.assertEqual(self.history.line_current, 'test1')
-        self.history.append('test2')
-        self.assertEqual(self.history.pos, 1)
-        self.assertEqual(len(self.history), 2)
-        self.assertEqual(list(self.history), ['test1', 'test2'])
-        self.assertEqual(self.history.line_current, 'test2')
-        self.history.append('test3')
-        self.assertEqual(self.history.pos, 2)
-        self.assertEqual(len(self.history), 3)
-        self.assertEqual(list(self.history), ['test1', 'test2', 'test3'])
-        self.assertEqual(self.history.line_current, 'test3')
-        self.history.append('test1')
-        self.assertEqual(self.history.pos, 2)
-        self.assertEqual(len(self.history), 3)
-        self.assertEqual(list(self.history), ['test2', 'test3', 'test1'])
-        self.assertEqual(self.history.line_current, 'test1')
+        self.assertEqual(self.history, [])
+        for step, (entry, entries, pos) in enumerate(self.APPEND_STEPS):
+            with self.subTest(step=step, entry=entry):
+                self.history.append(entry)
+                # History is a list: compare it without copying it
+                self.assertEqual(self.history, entries)
+                self.assertEqual(len(self.history), len(entries))
+                self.assertEqual(self.history.pos, pos)
+                self.assertEqual(self.history.line_current, entry)
 
     def test_load(self):
         data = ['line1', 'line2', 'line3']
-        with tempfile.NamedTemporaryFile('w+t') as temp_name:
-            temp_name.write(os.linesep.join(data))
-            temp_name.seek(0)
-            self.history.load(True, temp_name.name)
+        self._history_write(data)
+        self.history.load(True, self.history_path)
         self.assertEqual(self.history.pos, 2)
         self.assertEqual(list(self.history), data)
 
-        with tempfile.TemporaryDirectory() as tmp:
-            with unittest.mock.patch.dict(os.environ, {'HOME':  tmp}):
-                with open(os.path.join(tmp, '.pycom_history'), 'w+') as hfd:
-                    hfd.write(os.linesep.join(data))
-                self.history.load()
-                self.assertEqual(self.history.pos, 5)
-                self.assertEqual(list(self.history), data + data)
-                self.history.save()
-                with open(os.path.join(tmp, '.pycom_history')) as hfd:
-                    content = hfd.read()
-        self.assertEqual(os.linesep.join(data + data) + os.linesep, content)
-
-        with tempfile.TemporaryDirectory() as tmp:
-            with unittest.mock.patch.dict(os.environ, {'HOME':  tmp}):
-                with self.assertRaises(pycom.history.History.Error):
-                    self.history.save()
+        default_path = Path(self.home, '.pycom_history')
+        with unittest.mock.patch.dict(os.environ, {'HOME': self.home}):
+            default_path.write_text(os.linesep.join(data))
+            self.history.load()
+            self.assertEqual(self.history.pos, 5)
+            self.assertEqual(list(self.history), data + data)
+            self.history.save()
+        self.assertEqual(os.linesep.join(data + data) + os.linesep,
+                         default_path.read_text())
+
+        # The history file directory does not exist
+        self.history.history_file = os.path.join(self.home, 'missing',
+                                                 '.pycom_history')
+        with self.assertRaises(pycom.history.History.Error):
+            self.history.save()
+
+    def test_save_append(self):
+        data = ['line1', 'line2', 'line3']
+        self._history_write(data)
+        path = Path(self.history_path)
+        self.history.load(True, self.history_path)
+        self.history.append('line4')
+        self.assertEqual(path.read_text(),
+                         os.linesep.join(data + ['line4']) + os.linesep)
+        self.history.append('line5')
+        self.assertEqual(
+            path.read_text(),
+            os.linesep.join(data + ['line4', 'line5']) + os.linesep)
+        self.history.append('line1')
+        self.assertEqual(
+            path.read_text(),
+            os.linesep.join(['line2', 'line3', 'line4', 'line5', 'line1'])
+            + os.linesep)
 
     def test_pos_update_empty(self):
         self.assertEqual(list(self.history), [])
@@ -132,10 +143,8 @@ class TestHistory(TestCommon):
 
     def test_pos_update(self):
         data = ['line1', 'line2', 'line3']
-        with tempfile.NamedTemporaryFile('w+t') as temp_name:
-            temp_name.write(os.linesep.join(data))
-            temp_name.seek(0)
-            self.history.load(True, temp_name.name)
+        self._history_write(data)
+        self.history.load(True, self.history_path)
         self.assertEqual(self.history.pos, 2)
         self.assertEqual(list(self.history), data)
         self.assertTrue(self.history.pos_update(-1))
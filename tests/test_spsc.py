@@ -0,0 +1,72 @@
+import queue
+import threading
+import time
+
+from tests.common import TestCommon
+from pycom.spsc import SPSCQueue
+
+
+class TestSPSCQueue(TestCommon):
+    def setUp(self):
+        super().setUp()
+        self.queue = SPSCQueue(4)
+
+    def test_capacity(self):
+        for capacity in [0, 3, 6, -4]:
+            with self.assertRaises(ValueError):
+                SPSCQueue(capacity)
+
+    def test_empty(self):
+        self.assertTrue(self.queue.empty())
+        self.assertEqual(self.queue.qsize(), 0)
+        with self.assertRaises(queue.Empty):
+            self.queue.get_nowait()
+
+    def test_order(self):
+        for item in range(3):
+            self.queue.put_nowait(item)
+        self.assertEqual(self.queue.qsize(), 3)
+        self.assertEqual([self.queue.get_nowait() for _ in range(3)],
+                         [0, 1, 2])
+        self.assertTrue(self.queue.empty())
+
+    def test_full(self):
+        for item in range(4):
+            self.queue.put_nowait(item)
+        with self.assertRaises(queue.Full):
+            self.queue.put_nowait(4)
+        self.assertEqual(self.queue.get_nowait(), 0)
+        self.queue.put_nowait(4)
+        self.assertEqual(len(self.queue), 4)
+
+    def test_wrap(self):
+        for item in range(10):
+            self.queue.put_nowait(item)
+            self.queue.put_nowait(-item)
+            self.assertEqual(self.queue.get_nowait(), item)
+            self.assertEqual(self.queue.get_nowait(), -item)
+        self.assertTrue(self.queue.empty())
+
+    def test_threads(self):
+        count = 1000
+        received = []
+
+        def consume():
+            while len(received) < count:
+                try:
+                    received.append(self.queue.get_nowait())
+                except queue.Empty:
+                    time.sleep(0)
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        for item in range(count):
+            while True:
+                try:
+                    self.queue.put_nowait(item)
+                    break
+                except queue.Full:
+                    time.sleep(0)
+        consumer.join(10)
+        self.assertFalse(consumer.is_alive())
+        self.assertEqual(received, list(range(count)))
@@ -7,6 +7,7 @@ import unittest.mock
 from tests.common import TestCommon
 from pycom.config import Config
 import pycom.term_win
+import pycom.utils
 from pycom.term_win import Interface, TermLine, TermWindow
 from pycom.cursorpos import CursorPos
 from pycom.window import Window
@@ -15,6 +16,10 @@ from pycom.window import Window
 class TestTermLine(TestCommon):
     COL_NB = 30
     LINE_NB = 25
+    # Full window lines
+    DASHES = '-' * COL_NB
+    ONES = '1' * COL_NB
+    TWOS = '2' * COL_NB
 
     def setUp(self):
         super().setUp()
@@ -37,6 +42,12 @@ class TestTermLine(TestCommon):
         self.line = TermLine(self.LINE_NB, self.COL_NB, '123')
         self.assertEqual(hash(self.line), hash(TermLine(1, 2, '123')))
         self.assertEqual(self.line, TermLine(1, 2, '123'))
+        self.line.write('4')
+        self.assertEqual(hash(self.line), hash('1234'))
+        self.line.delete()
+        self.assertEqual(hash(self.line), hash('123'))
+        self.line.reset('5')
+        self.assertEqual(hash(self.line), hash('5'))
 
     def test_line_empty(self):
         self.line = TermLine(self.LINE_NB, self.COL_NB)
@@ -68,7 +79,7 @@ class TestTermLine(TestCommon):
 
     def test_line_content_long(self):
         part = 'very long line'
-        dashes = '-' * self.COL_NB
+        dashes = self.DASHES
         line_content = dashes + part + dashes
         line = TermLine(self.LINE_NB, self.COL_NB, line_content)
         self.assertEqual(line._content, line_content)
@@ -85,13 +96,13 @@ class TestTermLine(TestCommon):
         self.assertEqual(str(line), line_content)
 
     def test_line_content_full(self):
-        line_content = '-' * self.COL_NB * self.LINE_NB
+        line_content = self.DASHES * self.LINE_NB
         part = 'very long line'
         line_content += part
         line = TermLine(self.LINE_NB, self.COL_NB, line_content)
         self.assertEqual(line._content, line_content)
         self.assertEqual(
-            line.get(), ['-' * self.COL_NB] * (self.LINE_NB - 1) + [part])
+            line.get(), [self.DASHES] * (self.LINE_NB - 1) + [part])
 
     def test_write_char(self):
         self.line.write('a')
@@ -102,32 +113,32 @@ class TestTermLine(TestCommon):
         self.assertEqual(self.line.screen_pos, (0, 2))
 
     def test_fullline(self):
-        self.line.write('-' * self.COL_NB)
-        self.assertEqual(self.line.content, ['-' * self.COL_NB])
+        self.line.write(self.DASHES)
+        self.assertEqual(self.line.content, [self.DASHES])
         self.assertEqual(self.line.pos, self.COL_NB)
         self.assertEqual(self.line.screen_pos, (1, 0))
 
         self.line.write('N')
-        self.assertEqual(self.line.content, ['-' * self.COL_NB, 'N'])
+        self.assertEqual(self.line.content, [self.DASHES, 'N'])
         self.assertEqual(self.line.pos, self.COL_NB + 1)
         self.assertEqual(self.line.screen_pos, (1, 1))
 
     def test_fulllines(self):
-        self.line.write('-' * self.COL_NB)
-        self.assertEqual(self.line.content, ['-' * self.COL_NB])
+        self.line.write(self.DASHES)
+        self.assertEqual(self.line.content, [self.DASHES])
         self.assertEqual(self.line.pos, self.COL_NB)
         self.assertEqual(self.line.screen_pos, (1, 0))
 
         self.line.write('N' * self.COL_NB)
-        self.assertEqual(self.line.content, ['-' * self.COL_NB,
+        self.assertEqual(self.line.content, [self.DASHES,
                                              'N' * self.COL_NB])
         self.assertEqual(self.line.pos, self.COL_NB * 2)
         self.assertEqual(self.line.screen_pos, (2, 0))
 
     def test_write_pos(self):
-        self.line.write('1' * self.COL_NB + '2' * self.COL_NB)
-        self.assertEqual(self.line.content, ['1' * self.COL_NB,
-                                             '2' * self.COL_NB])
+        self.line.write(self.ONES + self.TWOS)
+        self.assertEqual(self.line.content, [self.ONES,
+                                             self.TWOS])
 
         self.line.update_pos(CursorPos.HOME)
         self.line.write('0')
@@ -205,35 +216,35 @@ class TestTermLine(TestCommon):
         self.assertEqual(self.line.screen_pos, (0, 0))
 
     def test_del(self):
-        self.line.write('1' * self.COL_NB + '2' * self.COL_NB + '34')
-        self.assertEqual(self.line.content, ['1' * self.COL_NB,
-                                             '2' * self.COL_NB,
+        self.line.write(self.ONES + self.TWOS + '34')
+        self.assertEqual(self.line.content, [self.ONES,
+                                             self.TWOS,
                                              '34'])
         self.line.delete()
         self.assertEqual(self.line._content,
-                         '1' * self.COL_NB + '2' * self.COL_NB + '3')
-        self.assertEqual(self.line.content, ['1' * self.COL_NB,
-                                             '2' * self.COL_NB,
+                         self.ONES + self.TWOS + '3')
+        self.assertEqual(self.line.content, [self.ONES,
+                                             self.TWOS,
                                              '3'])
         self.assertEqual(self.line.pos, self.COL_NB * 2 + 1)
         self.assertEqual(self.line.screen_pos, (2, 1))
 
         self.line.delete()
-        self.assertEqual(self.line.content, ['1' * self.COL_NB,
-                                             '2' * self.COL_NB])
+        self.assertEqual(self.line.content, [self.ONES,
+                                             self.TWOS])
         self.assertEqual(self.line.pos, self.COL_NB * 2)
         self.assertEqual(self.line.screen_pos, (2, 0))
 
         self.line.delete()
-        self.assertEqual(self.line.content, ['1' * self.COL_NB,
+        self.assertEqual(self.line.content, [self.ONES,
                                              '2' * (self.COL_NB - 1)])
         self.assertEqual(self.line.pos, self.COL_NB * 2 - 1)
         self.assertEqual(self.line.screen_pos, (1, self.COL_NB - 1))
 
     def test_del_pos(self):
-        self.line.write('1' * self.COL_NB + '2' * self.COL_NB)
-        self.assertEqual(self.line.content, ['1' * self.COL_NB,
-                                             '2' * self.COL_NB])
+        self.line.write(self.ONES + self.TWOS)
+        self.assertEqual(self.line.content, [self.ONES,
+                                             self.TWOS])
         self.line.update_pos(CursorPos.HOME)
         self.line.write('0')
         self.assertEqual(self.line.content, ['0' + '1' * (self.COL_NB - 1),
@@ -242,6 +253,53 @@ class TestTermLine(TestCommon):
         self.assertEqual(self.line.pos, 1)
         self.assertEqual(self.line.screen_pos, (0, 1))
 
+    def test_line_count(self):
+        self.assertEqual(self.line.line_count, len(self.line.content))
+        for content in ['a', '1' * (self.COL_NB - 1), '2', '3' * self.COL_NB]:
+            self.line.write(content)
+            self.assertEqual(self.line.line_count, len(self.line.content))
+        self.line.prompt_set(1)
+        self.assertEqual(self.line.line_count, len(self.line.content))
+
+    def test_content_cache(self):
+        self.line.write('abc')
+        content = self.line.content
+        self.assertIs(self.line.content, content)
+        self.line.write('d')
+        self.assertEqual(self.line.content, ['abcd'])
+        self.line.prompt_set(1)
+        self.assertEqual(self.line.content,
+                         [TermLine.PROMPT_FMT.format(1) + 'abcd'])
+
+    def test_content_rows(self):
+        line = TermLine(self.LINE_NB, 4)
+        for action, arg in [('write', 'abcdefghij'), ('write', 'kl'),
+                            ('update_pos', -7), ('write', '123'),
+                            ('delete', 2), ('update_pos', 5),
+                            ('delete', 9), ('prompt_set', 3),
+                            ('write', 'mnopq')]:
+            content = line.content
+            previous = list(content)
+            getattr(line, action)(arg)
+            with self.subTest(action=action, arg=arg):
+                expected = pycom.utils.chunks(line.prompt + str(line), 4)
+                self.assertEqual(line.content, expected)
+                self.assertEqual(content, previous)
+
+    def test_del_middle(self):
+        self.line.write('abcdef')
+        self.line.update_pos(-2)
+        self.line.write('12')
+        self.line.write('3')
+        self.assertEqual(str(self.line), 'abcd123ef')
+        self.line.delete(4)
+        self.assertEqual(str(self.line), 'abcef')
+        self.assertEqual(self.line.pos, 3)
+        self.line.delete(10)
+        self.assertEqual(str(self.line), 'ef')
+        self.assertEqual(len(self.line), 2)
+        self.assertEqual(self.line.pos, 0)
+
     def test_pos_out(self):
         self.line.write('1' * 4)
         self.line.update_pos(-10)
@@ -259,17 +317,17 @@ class TestTermLine(TestCommon):
         self.assertEqual(self.line.get(), [])
 
     def test_get(self):
-        self.line.write('-' * self.COL_NB * (self.LINE_NB - 2))
-        self.line.write('1' * self.COL_NB)
-        self.line.write('2' * self.COL_NB)
+        self.line.write(self.DASHES * (self.LINE_NB - 2))
+        self.line.write(self.ONES)
+        self.line.write(self.TWOS)
         self.assertEqual(self.line.get(),
-                         ['-' * self.COL_NB] * (self.LINE_NB - 2)
-                         + ['1' * self.COL_NB]
-                         + ['2' * self.COL_NB])
+                         [self.DASHES] * (self.LINE_NB - 2)
+                         + [self.ONES]
+                         + [self.TWOS])
         self.assertEqual(self.line.get(3),
-                         ['-' * self.COL_NB]
-                         + ['1' * self.COL_NB]
-                         + ['2' * self.COL_NB])
+                         [self.DASHES]
+                         + [self.ONES]
+                         + [self.TWOS])
 
     def test_del_full(self):
         for idx in range(1, self.LINE_NB + 11):
@@ -302,7 +360,7 @@ class TestTermLine(TestCommon):
         self.assertEqual(self.line.content, [prompt])
         self.assertEqual(len(self.line.content[0]), length)
 
-        self.line.write('1' * self.COL_NB + '2' * self.COL_NB)
+        self.line.write(self.ONES + self.TWOS)
         expected = [prompt + '1' * (self.COL_NB - length),
                     '1' * length + '2' * (self.COL_NB - length),
                     '2' * length]
@@ -332,7 +390,7 @@ class TestTermLine(TestCommon):
         self.assertEqual(self.line.pos, 2 * self.COL_NB - 1)
         self.assertEqual(self.line.screen_pos, (2, length - 1))
         self.assertEqual(self.line._content,
-                         '1' * self.COL_NB + '2' * (self.COL_NB - 1))
+                         self.ONES + '2' * (self.COL_NB - 1))
         expected = [prompt + '1' * (self.COL_NB - length),
                     '1' * length + '2' * (self.COL_NB - length),
                     '2' * (length - 1)]
@@ -342,7 +400,7 @@ class TestTermLine(TestCommon):
         self.assertEqual(self.line.pos, 2 * self.COL_NB - 11)
         self.assertEqual(self.line.screen_pos, (2, length - 11))
         self.assertEqual(self.line._content,
-                         '1' * self.COL_NB  + '2' * (self.COL_NB - 11))
+                         self.ONES  + '2' * (self.COL_NB - 11))
         expected = [prompt + '1' * (self.COL_NB - length),
                     '1' * length + '2' * (self.COL_NB - length),
                     '2' * (length - 11)]
@@ -353,19 +411,19 @@ class TestTermLine(TestCommon):
 class MockWindow(Window):
     def __init__(self, lines, columns, posy, posx):
         def clear():
-            self.line_buffer = [''] * self.lines
+            self.buffer[:] = bytes(len(self.buffer))
             self.posx = 0
             self.posy = 0
 
         def clrtoeol():
-            line = self.line_buffer[self.posy]
-            self.line_buffer[self.posy] = line[:self.posx]
+            start = self.posy * self.columns + self.posx
+            end = (self.posy + 1) * self.columns
+            self.buffer[start:end] = bytes(end - start)
 
         def clrtobot():
             self.logger.debug('Clearing from %d.%d', self.posy, self.posx)
-            self.clrtoeol()
-            for idx in range(self.posy + 1, self.lines):
-                self.line_buffer[idx] = ''
+            start = self.posy * self.columns + self.posx
+            self.buffer[start:] = bytes(len(self.buffer) - start)
 
         def move(posy, posx):
             self.logger.debug('Moving to %d.%d', posy, posx)
@@ -378,7 +436,8 @@ class MockWindow(Window):
         self.columns = columns
         self.posy = posy
         self.posx = posx
-        self.line_buffer = [''] * lines
+        # Flat screen content, the cleared cells being null bytes
+        self.buffer = bytearray(lines * columns)
 
         self.clear = unittest.mock.Mock(side_effect=clear)
         self.clrtoeol = unittest.mock.Mock(side_effect=clrtoeol)
@@ -387,19 +446,15 @@ class MockWindow(Window):
         self.keypad = unittest.mock.Mock()
         self.move = unittest.mock.Mock(side_effect=move)
         self.refresh = unittest.mock.Mock()
-
-    def __getattr__(self, attr):
-        mock = unittest.mock.Mock()
-        setattr(self, attr, mock)
-        return mock
+        self.timeout = unittest.mock.Mock()
 
     def addstr(self, posy, posx, line, attr=None):
         self.logger.debug('Writing buffer at %dx%d: "%s"', posy, posx, line)
         if not line:
             return
-        buf = self.line_buffer[posy][:posx] + line
-        buf += self.line_buffer[posy][posx + len(line):]
-        self.line_buffer[posy] = buf
+        start = posy * self.columns + posx
+        data = line.encode('latin-1')[:len(self.buffer) - start]
+        self.buffer[start:start + len(data)] = data
         self.posy = posy + (posx + len(line)) // self.columns
         self.posx = (posx + len(line)) % self.columns
         self.logger.debug('Resulting pos %d.%d', self.posy, self.posx)
@@ -410,6 +465,12 @@ class MockWindow(Window):
     def getmaxyx(self):
         return self.lines, self.columns
 
+    @property
+    def line_buffer(self):
+        return [self.buffer[start:start + self.columns].rstrip(b'\0')
+                .decode('latin-1')
+                for start in range(0, len(self.buffer), self.columns)]
+
 
 class TestTermWindow(TestCommon):
     COLUMNS = 80
@@ -433,6 +494,10 @@ class TestTermWindow(TestCommon):
         self.termwin.read()
         self.window.getch.assert_called_once()
 
+    def test_timeout(self):
+        self.termwin.timeout(16)
+        self.window.timeout.assert_called_once_with(16)
+
     def test_prompt(self):
         self.assertEqual(self.window.line_buffer, [''] * self.LINES)
         termline_prompt = self.termwin.line_create()
@@ -463,6 +528,35 @@ class TestTermWindow(TestCommon):
         self.assertEqual(self.window.posy, 0)
         self.assertEqual(self.window.posx, 0)
 
+    def test_redraw_idle(self):
+        self.termwin.write('test')
+        self.assertTrue(self.termwin.redraw())
+        self.window.refresh.assert_called_once()
+        self.assertFalse(self.termwin.redraw())
+        self.window.refresh.assert_called_once()
+
+    def test_redraw_rows(self):
+        self.termwin.prompt_enable(False)
+        lines = [self.termwin.line_create(line) for line in 'abc']
+        self.termwin.write(lines)
+        self.termwin.redraw()
+        lines[0].write('1')
+        with unittest.mock.patch.object(self.window, 'addstr',
+                                        wraps=self.window.addstr) as addstr:
+            self.termwin.write(lines)
+            self.termwin.redraw()
+        self.assertEqual(addstr.call_args_list,
+                         [unittest.mock.call(0, 0, 'a1', 0),
+                          unittest.mock.call(2, 0, 'c', 0)])
+        self.assertEqual(self.window.line_buffer,
+                         ['a1', 'b', 'c'] + [''] * (self.LINES - 3))
+
+        self.termwin.clear()
+        self.termwin.write(lines)
+        self.termwin.redraw()
+        self.assertEqual(self.window.line_buffer,
+                         ['a1', 'b', 'c'] + [''] * (self.LINES - 3))
+
     def test_one_line(self):
         prompt = TermLine.PROMPT_FMT.format(1)
         line = 'small line'
@@ -582,18 +676,34 @@ class TestTermWindow(TestCommon):
         self.termwin.redraw()
         self.assertEqual(self.window.clear.call_count, 2)
 
+    def test_iterator(self):
+        self.termwin.prompt_enable(False)
+        self.termwin.write(iter(['first', 'second']))
+        content, _ = self.termwin._pending
+        self.assertEqual([line for _, _, line in content],
+                         ['first', 'second'])
+
+    def test_line_pool(self):
+        line = self.termwin.line_create('first', num=3)
+        line.write('x')
+        line.highlight()
+        self.termwin.lines_release([line])
+        reused = self.termwin.line_create('second')
+        self.assertIs(reused, line)
+        self.assertEqual(str(reused), 'second')
+        self.assertEqual(reused.pos, len('second'))
+        self.assertEqual(reused.attr, 0)
+        self.assertIsNot(self.termwin.line_create('third'), line)
+
     def test_title(self):
         pass
 
     def test_line_str(self):
         self.termwin.prompt_enable(False)
         self.termwin.write('test')
-        content, _ = self.termwin.queue.get()
-        termline = TermLine(window_cols=self.termwin.dim[1],
-                            window_lines=self.termwin.dim[0],
-                            content='test')
-        screenlines = ['test']
-        self.assertEqual([(termline, screenlines)], content)
+        content, position = self.termwin._pending
+        self.assertEqual([(0, 0, 'test')], content)
+        self.assertEqual(position, (0, len('test')))
 
 
 class CustomMagic(type):
@@ -642,3 +752,16 @@ class TestInterface(TestCommon):
             del interface
             mocked_curses.echo.assert_called()
             mocked_curses.nocbreak.assert_called()
+
+    def test_redraw_request(self):
+        with unittest.mock.patch('pycom.term_win.curses',
+                                 new=MockCurses):
+            interface = Interface(Config())
+            self.assertFalse(interface.redraw_requested())
+            interface.request_redraw()
+            self.assertTrue(interface.redraw_requested())
+            interface.redraw()
+            self.assertFalse(interface.redraw_requested())
+            interface.write('unknown', 'test')
+            self.assertFalse(interface.redraw_requested())
+            del interface
@@ -1,14 +1,21 @@
+from copy import deepcopy
+import curses
+import curses.ascii
+import io
 import json
 import logging
 import logging.config
 import os
 from pathlib import Path
+import random
 import tempfile
 import unittest.mock
+import weakref
 
 from tests.common import TestCommon
 from pycom.utils import (
-    chunks, dict_update_deep, eval_math_simple, logging_level, project_load_json
+    ASCII_MAP, chunks, compile_math_simple, dict_update_deep,
+    eval_math_simple, key_describe, logging_level, project_load_json
 )
 
 
@@ -22,6 +29,18 @@ class TestDictUpdate(TestCommon):
             dict_update_deep({'a': 1, 'b': 2}, {'b': 'two', 'c': 'three'}),
             {'a': 1, 'b': 'two', 'c': 'three'})
 
+    def test_empty(self):
+        self.assertEqual(dict_update_deep({}, {'a': {'b': 1}}),
+                         {'a': {'b': 1}})
+        self.assertEqual(dict_update_deep({'a': {}, 'c': 3},
+                                          {'a': {'b': {'c': 1}}}),
+                         {'a': {'b': {'c': 1}}, 'c': 3})
+
+    def test_replace_type(self):
+        self.assertEqual(
+            dict_update_deep({'a': {'b': 1}, 'c': 3}, {'a': 1, 'c': {'d': 4}}),
+            {'a': 1, 'c': {'d': 4}})
+
     def test_merge_deep(self):
         dict1 = {
             'a': 1,
@@ -96,6 +115,34 @@ class TestDictUpdate(TestCommon):
         }
         self.assertEqual(dict_update_deep(dict1, dict2), exp)
 
+    @classmethod
+    def _merge(cls, dict1, dict2):
+        '''Reference recursive merge, returning a new dictionary'''
+        merged = dict(dict1)
+        for key, value in dict2.items():
+            if isinstance(merged.get(key), dict) and isinstance(value, dict):
+                merged[key] = cls._merge(merged[key], value)
+            else:
+                merged[key] = value
+        return merged
+
+    @classmethod
+    def _random_dict(cls, rand, depth=3):
+        return {rand.choice('abcd'): (cls._random_dict(rand, depth - 1)
+                                      if depth and rand.random() < 0.5
+                                      else rand.randrange(10))
+                for _ in range(rand.randrange(5))}
+
+    def test_random(self):
+        # Fixed seed, for reproducible failures
+        rand = random.Random(0)
+        for _ in range(200):
+            dict1 = self._random_dict(rand)
+            dict2 = self._random_dict(rand)
+            with self.subTest(dict1=dict1, dict2=dict2):
+                self.assertEqual(dict_update_deep(deepcopy(dict1), dict2),
+                                 self._merge(dict1, dict2))
+
 
 
 class TestProjectLoadJson(TestCommon):
@@ -109,6 +156,13 @@ class TestProjectLoadJson(TestCommon):
         os.chdir(path.parent)
         self.assertEqual(data, project_load_json(path.name))
 
+    def test_file(self):
+        data = {'a': 1, 'b': [2, 3]}
+        self.assertEqual(data, project_load_json(
+            io.BytesIO(json.dumps(data).encode('utf-8'))))
+        self.assertEqual(data, project_load_json(io.StringIO(json.dumps(data)),
+                                                 toolname='toolname'))
+
     def test_config_default(self):
         data = {'a': 1, 'b': 2, 'c': 3}
         toolname = 'toolname'
@@ -125,13 +179,16 @@ class TestProjectLoadJson(TestCommon):
 
 
 class MockLogging(unittest.mock.MagicMock):
-    LOGGERS = {}
+    # Only the loggers still referenced, to not keep them from a test to the
+    # other
+    LOGGERS = weakref.WeakValueDictionary()
     NOTSET, DEBUG, INFO, WARN, WARNING, ERROR, CRITICAL = 0, 1, 2, 3, 3, 4, 5
 
     def getLogger(name=None):
-        MockLogging.LOGGERS[name] = unittest.mock.MagicMock()
-        MockLogging.LOGGERS[name].level = MockLogging.NOTSET
-        return MockLogging.LOGGERS[name]
+        logger = unittest.mock.MagicMock()
+        logger.level = MockLogging.NOTSET
+        MockLogging.LOGGERS[name] = logger
+        return logger
 
 
 class TestLoggingInit(TestCommon):
@@ -181,6 +238,18 @@ class TestChunk(TestCommon):
         self.assertEqual(list(chunks([1, 2, 3], 2)), [[1, 2], [3]])
 
 
+class TestKeyDescribe(TestCommon):
+    def test_describe(self):
+        for key, description in ASCII_MAP.items():
+            self.assertEqual(key_describe(key), description)
+
+    def test_unknown(self):
+        self.assertIsNone(key_describe(ord('a')))
+        self.assertIsNone(key_describe(curses.KEY_F1))
+        self.assertIsNone(key_describe(-1))
+        self.assertEqual(key_describe(curses.ascii.ESC), 'ESC - Escape')
+
+
 class TestEvalMathSimple(TestCommon):
     def test_num(self):
         self.assertEqual(eval_math_simple(2), 2)
@@ -216,5 +285,19 @@ class TestEvalMathSimple(TestCommon):
         self.assertEqual(eval_math_simple('2 + 5* 3 + 14/2 + 10//2'),
                          2 + 5 * 3 + 14 / 2 + 10 // 2)
 
+    def test_left_to_right(self):
+        self.assertEqual(eval_math_simple('10 - 2 + 3'), 10 - 2 + 3)
+        self.assertEqual(eval_math_simple('12 / 2 * 3'), 12 / 2 * 3)
+        self.assertEqual(eval_math_simple('7 // 2 * 2 - 1 - 1'),
+                         7 // 2 * 2 - 1 - 1)
+
     def test_unknown(self):
         self.assertEqual(eval_math_simple('2 % 5'), None)
+        self.assertEqual(eval_math_simple('2 + a'), None)
+
+    def test_compile_variables(self):
+        expr = compile_math_simple('{cols} // 2 + {lines} - 3')
+        self.assertEqual(expr({'cols': 40, 'lines': 30}), 40 // 2 + 30 - 3)
+        self.assertEqual(expr({'cols': 81, 'lines': 3}), 81 // 2 + 3 - 3)
+        with self.assertRaises(KeyError):
+            expr({'cols': 40})